@@ -0,0 +1,121 @@
+"""Check HttpFetcher against the local fixture site, without a browser.
+
+Fetches item pages and a listing from a FixtureSite and compares what
+HttpFetcher parsed with the values the fixture generated. Some item pages
+are replaced by recorded copies: pages carrying only the embedded state,
+pages carrying only JSON-LD, and pages with no product data at all, for
+which fetch_product must return None so the scraper falls back to the
+browser. Prints each mismatch and exits non-zero if there were any.
+
+    python benchmarks/check_http_fetcher.py --items 30
+"""
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_site import PAGE, FixtureSite
+
+_STATE_SCRIPT = re.compile(r'<script id="__NEXT_DATA__".*?</script>', re.S)
+_BREADCRUMBS = re.compile(r'<ul class="breadcrumbs">.*?</ul>', re.S)
+
+# Recorded page kind for item_id % 4 (0: the generated page)
+KINDS = (None, 'state', 'json_ld', 'empty')
+
+
+def _record_pages(site, directory):
+    """Write recorded item pages into directory; returns {item_id: kind}"""
+    kinds = {}
+    for item_id in range(1, site.items + 1):
+        kind = KINDS[item_id % len(KINDS)]
+        kinds[item_id] = kind
+        if kind is None:
+            continue
+        page = site._item_page(item_id)
+        _, title, brand, _, price = site._item(item_id)
+        if kind == 'state':
+            body = _BREADCRUMBS.search(page).group(0) + _STATE_SCRIPT.search(page).group(0)
+        elif kind == 'json_ld':
+            product = {
+                '@context': 'https://schema.org', '@type': 'Product', 'name': title,
+                'brand': {'@type': 'Brand', 'name': brand},
+                'image': [f"{site.url}/images/{item_id}/{n}.jpg"
+                          for n in range(1, site.images_per_item + 1)],
+                'offers': {'@type': 'Offer', 'price': f"{price:.2f}", 'priceCurrency': 'USD'},
+            }
+            body = (_BREADCRUMBS.search(page).group(0) +
+                    f'<script type="application/ld+json">{json.dumps(product)}</script>')
+        else:
+            body = '<p>Sorry, this page is not available right now.</p>'
+        path = os.path.join(directory, 'items', f"{item_id}-fixture-item-{item_id}.html")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(PAGE.format(title=html.escape(title), body=body))
+    return kinds
+
+
+def check_item(site, item_id, kind, payload):
+    """Mismatches between a fetched payload and the fixture's item"""
+    if kind == 'empty':
+        return [] if payload is None else [f"item {item_id}: expected None for a page without data"]
+    if payload is None:
+        return [f"item {item_id} ({kind or 'html'}): no payload"]
+    _, title, brand, _, price = site._item(item_id)
+    details = payload.get('details') or {}
+    expected = {
+        'title': (details.get('title'), title),
+        'brand': (details.get('brand'), brand),
+        'price': (re.sub(r'[^\d.]', '', details.get('price') or ''), f"{price:.2f}"),
+        'images': (len(payload.get('image_urls') or ()), site.images_per_item),
+        'breadcrumbs': (payload.get('breadcrumbs'),
+                        f"Home > {('Women', 'Men', 'Kids')[item_id % 3]} > Clothing"),
+    }
+    if kind == 'state':
+        expected['seller'] = ((payload.get('seller_info') or {}).get('seller_name'), f"seller{item_id % 50}")
+    return [f"item {item_id} ({kind or 'html'}) {name}: got {got!r}, expected {want!r}"
+            for name, (got, want) in expected.items() if got != want]
+
+
+def run(items, recorded_dir):
+    from http_fetcher import HttpFetcher
+    from scheduler import CrawlScheduler
+    from session import catalog_url
+
+    site = FixtureSite(items=items, recorded_dir=recorded_dir)
+    kinds = _record_pages(site, recorded_dir)
+    fetcher = HttpFetcher(http2=False, scheduler=CrawlScheduler(rate=10_000, burst=10_000,
+                                                                concurrency=64, jitter=0))
+    problems = []
+    try:
+        with site:
+            tiles = fetcher.fetch_listing(catalog_url(site.url, search_text='fixture'))
+            if len(tiles or ()) != min(site.per_page, items):
+                problems.append(f"listing: got {len(tiles or ())} tiles, expected {min(site.per_page, items)}")
+            for item_id, url in enumerate(site.item_urls(), start=1):
+                problems.extend(check_item(site, item_id, kinds[item_id], fetcher.fetch_product(url)))
+    finally:
+        fetcher.close()
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check HttpFetcher against the fixture site")
+    parser.add_argument('--items', type=int, default=20)
+    parser.add_argument('--recorded', help="directory to write the recorded pages to (default: a temp dir)")
+    args = parser.parse_args()
+
+    if args.recorded:
+        problems = run(args.items, args.recorded)
+    else:
+        with tempfile.TemporaryDirectory() as recorded:
+            problems = run(args.items, recorded)
+    for problem in problems:
+        print(problem)
+    print(f"{len(problems)} mismatches in {args.items} items")
+    sys.exit(1 if problems else 0)
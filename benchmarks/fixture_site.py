@@ -0,0 +1,295 @@
+"""Local HTTP server imitating vinted.com for offline benchmarks.
+
+Serves a home page (with the country and cookie popups), the Women
+catalog, search results and catalog deep links with pagination, item
+pages and item photos.
+Pages are generated from templates that match the selectors in
+extraction.py and the embedded state read by http_fetcher, unless a
+recorded copy exists in ``recorded_dir`` (the request path, plus
+``.html`` for pages). Every response can be delayed by ``latency`` (plus
+up to ``jitter``) seconds and fails with ``failure_status`` at
+``failure_rate``.
+"""
+import html
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote_plus, urlencode, urlparse
+
+BRANDS = ['Zara', 'H&M', 'Mango', 'Levi\'s', 'Nike', 'Adidas', 'COS', 'Uniqlo']
+SIZES = ['XS', 'S', 'M', 'L', 'XL']
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body><div id="content">{body}</div></body></html>
+"""
+
+HOME_BODY = """
+<div class="web_ui__Navigation__right">
+  <button class="web_ui__Button__button" onclick="this.parentNode.remove()">Close</button>
+</div>
+<button id="onetrust-reject-all-handler" onclick="this.remove()">Reject all</button>
+<nav><a href="/catalog">Women</a></nav>
+"""
+
+CATALOG_BODY = """
+<ul><li class="web_ui__Cell__default"><div class="web_ui__Cell__body">
+  <a class="web_ui__Text__body" href="/catalog/all">All</a>
+</div></li></ul>
+"""
+
+ITEM_BODY = """
+<ul class="breadcrumbs">
+  <li class="breadcrumbs__item"><a href="/">Home</a></li>
+  <li class="breadcrumbs__item"><a href="/catalog">{category}</a></li>
+  <li class="breadcrumbs__item"><a href="/catalog">Clothing</a></li>
+</ul>
+<div class="item-photos">{photos}</div>
+<div class="details-list details-list--main-info">
+  <div class="web_ui__Text__title">{title}</div>
+  <div class="summary-max-lines-4">
+    <span class="web_ui__Text__text web_ui__Text__clickable">{brand}</span>
+    <span class="web_ui__Text__text">Very good</span>
+  </div>
+</div>
+<div class="details-list details-list--pricing">
+  <div data-testid="item-price"><p>${price}</p></div>
+  <div data-testid="service-fee-included-title">${protection} includes Buyer Protection</div>
+</div>
+<div class="details-list details-list--details">
+  <div class="details-list__item">
+    <div class="details-list__item-value">Size</div><div class="details-list__item-value">{size}</div>
+  </div>
+  <div class="details-list__item">
+    <div class="details-list__item-value">Uploaded</div><div class="details-list__item-value">2 days ago</div>
+  </div>
+  <div class="details-list__item">
+    <div class="details-list__item-value">Views</div><div class="details-list__item-value">{views}</div>
+  </div>
+</div>
+<script id="__NEXT_DATA__" type="application/json">{state}</script>
+"""
+
+
+def item_url(base_url, item_id):
+    """URL of a generated item page"""
+    return f"{base_url}/items/{item_id}-fixture-item-{item_id}"
+
+
+class FixtureSite:
+    """Threaded local web server with ``items`` generated listings"""
+
+    def __init__(self, items=200, per_page=24, images_per_item=4, image_size=150_000,
+                 latency=0.0, jitter=0.0, failure_rate=0.0, failure_status=503,
+                 recorded_dir=None, seed=0, host='127.0.0.1', port=0):
+        self.items = items
+        self.per_page = per_page
+        self.images_per_item = images_per_item
+        self.image_size = image_size
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.recorded_dir = recorded_dir
+        self.seed = seed
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def item_urls(self, count=None):
+        return [item_url(self.url, i) for i in range(1, (count or self.items) + 1)]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-site", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _should_fail(self):
+        with self._lock:
+            self.requests += 1
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                self.failures += 1
+                return True
+        return False
+
+    def _delay(self):
+        with self._lock:
+            extra = self._random.uniform(0, self.jitter) if self.jitter else 0
+        if self.latency or extra:
+            time.sleep(self.latency + extra)
+
+    # Generated content
+
+    def _listing_page(self, title, page, link_base):
+        start = (page - 1) * self.per_page + 1
+        ids = range(start, min(start + self.per_page, self.items + 1))
+        boxes = ''.join(self._tile(i) for i in ids)
+        search_form = '<form action="/search"><input type="search" name="q"></form>'
+        pagination = ''
+        if start + self.per_page <= self.items:
+            separator = '&' if '?' in link_base else '?'
+            pagination = f'<a class="pagination-next" href="{link_base}{separator}page={page + 1}">Next</a>'
+        return PAGE.format(title=title, body=search_form + boxes + pagination)
+
+    def _item(self, item_id):
+        """Random generator plus the fields shared by an item's tile and page"""
+        rng = random.Random(self.seed * 1_000_003 + item_id)
+        return rng, f"Fixture item {item_id}", rng.choice(BRANDS), rng.choice(SIZES), \
+            round(rng.uniform(2, 80), 2)
+
+    def _tile(self, item_id):
+        _, title, brand, size, price = self._item(item_id)
+        label = html.escape(f"{title}, brand: {brand}, condition: Very good, size: {size}, ${price:.2f}")
+        return (
+            f'<div class="new-item-box__container">'
+            f'<div class="new-item-box__image-container">'
+            f'<img src="{self.url}/images/{item_id}/1.jpg">'
+            f'<a class="item-link" href="/items/{item_id}-fixture-item-{item_id}" title="{label}"></a></div>'
+            f'<p data-testid="product-item-id-{item_id}--description-title">{html.escape(brand)}</p>'
+            f'<p data-testid="product-item-id-{item_id}--description-subtitle">{size} · Very good</p>'
+            f'<p data-testid="product-item-id-{item_id}--price-text">${price:.2f}</p></div>'
+        )
+
+    def _item_page(self, item_id):
+        rng, title, brand, size, price = self._item(item_id)
+        photos = [f"{self.url}/images/{item_id}/{n}.jpg" for n in range(1, self.images_per_item + 1)]
+        state = {'props': {'pageProps': {'item': {
+            'id': item_id,
+            'title': title,
+            'brand_title': brand,
+            'size_title': size,
+            'status': 'Very good',
+            'price': {'amount': f"{price:.2f}", 'currency_code': 'USD'},
+            'description': f"Description of fixture item {item_id}.",
+            'photos': [{'full_size_url': url} for url in photos],
+            'user': {'login': f"seller{item_id % 50}", 'feedback_count': rng.randint(0, 500),
+                     'feedback_reputation': round(rng.random(), 2), 'city': 'Berlin',
+                     'country_title': 'Germany'},
+        }}}}
+        body = ITEM_BODY.format(
+            photos=''.join(f'<img class="web_ui__Image__content" src="{url}">' for url in photos),
+            title=html.escape(title),
+            brand=html.escape(brand),
+            category=('Women', 'Men', 'Kids')[item_id % 3],
+            price=f"{price:.2f}",
+            protection=f"{price * 1.05 + 0.7:.2f}",
+            size=size,
+            views=rng.randint(0, 2000),
+            state=json.dumps(state).replace('</', '<\\/'),
+        )
+        return PAGE.format(title=html.escape(title), body=body)
+
+    def _image(self, item_id, n):
+        # Deterministic bytes per photo behind a JPEG signature
+        data = random.Random(f"{self.seed}:{item_id}:{n}").randbytes(self.image_size)
+        return b'\xff\xd8\xff\xe0' + data[4:]
+
+    def _recorded(self, path):
+        if not self.recorded_dir:
+            return None
+        base = os.path.join(self.recorded_dir, *[p for p in path.split('/') if p])
+        for candidate in (base, base + '.html', os.path.join(base, 'index.html')):
+            if os.path.isfile(candidate):
+                with open(candidate, 'rb') as f:
+                    return f.read()
+        return None
+
+    def respond(self, path, query):
+        """(status, content type, body) for a request"""
+        recorded = self._recorded(path)
+        if recorded is not None:
+            content_type = 'image/jpeg' if path.startswith('/images/') else 'text/html; charset=utf-8'
+            return 200, content_type, recorded
+
+        page = int((query.get('page') or ['1'])[0])
+        if path in ('', '/'):
+            return 200, 'text/html; charset=utf-8', PAGE.format(title='Vinted', body=HOME_BODY).encode()
+        if path == '/robots.txt':
+            return 200, 'text/plain', b'User-agent: *\n'
+        if path == '/catalog' and query:
+            # Deep links: /catalog?search_text=...&catalog[]=...&page=N
+            params = urlencode([(k, v) for k, values in query.items() if k != 'page' for v in values])
+            title = html.escape((query.get('search_text') or ['All'])[0])
+            return 200, 'text/html; charset=utf-8', self._listing_page(title, page, f"/catalog?{params}").encode()
+        if path == '/catalog':
+            return 200, 'text/html; charset=utf-8', PAGE.format(title='Women', body=CATALOG_BODY).encode()
+        if path == '/catalog/all':
+            return 200, 'text/html; charset=utf-8', self._listing_page('All', page, '/catalog/all').encode()
+        if path == '/search':
+            term = (query.get('q') or [''])[0]
+            link = f"/search?q={quote_plus(term)}"
+            return 200, 'text/html; charset=utf-8', self._listing_page(html.escape(term), page, link).encode()
+        match = re.match(r'^/items/(\d+)', path)
+        if match and int(match.group(1)) <= self.items:
+            return 200, 'text/html; charset=utf-8', self._item_page(int(match.group(1))).encode()
+        match = re.match(r'^/images/(\d+)/(\d+)\.jpg$', path)
+        if match:
+            return 200, 'image/jpeg', self._image(int(match.group(1)), int(match.group(2)))
+        return 404, 'text/plain', b'Not found'
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                site._delay()
+                if site._should_fail():
+                    status, content_type, body = site.failure_status, 'text/plain', b'Fixture failure'
+                else:
+                    parsed = urlparse(self.path)
+                    status, content_type, body = site.respond(parsed.path, parse_qs(parsed.query))
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the benchmark fixture site")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--recorded', help="directory with recorded pages")
+    args = parser.parse_args()
+
+    site = FixtureSite(items=args.items, latency=args.latency, failure_rate=args.failure_rate,
+                       recorded_dir=args.recorded, port=args.port)
+    print(f"Serving fixture site at {site.url}")
+    try:
+        site._server.serve_forever()
+    except KeyboardInterrupt:
+        site.stop()
@@ -0,0 +1,78 @@
+"""Local-filesystem stand-in for the GCS bucket behind VintedStorage.
+
+Implements the part of the google-cloud-storage Bucket/Blob API the
+pipeline uses (uploads with if_generation_match, downloads, exists,
+generation), storing each blob as a file under ``root``. An optional
+per-call ``latency`` imitates the round trip to GCS.
+"""
+import os
+import threading
+import time
+
+from google.api_core.exceptions import NotFound, PreconditionFailed
+
+
+class LocalBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.path = os.path.join(bucket.root, *name.split('/'))
+        self.content_encoding = None
+        self.chunk_size = None
+        self.generation = None
+
+    def exists(self):
+        self.bucket.delay()
+        return os.path.exists(self.path)
+
+    def download_as_bytes(self):
+        self.bucket.delay()
+        with self.bucket.lock:
+            if not os.path.exists(self.path):
+                raise NotFound(f"No such object: {self.name}")
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            self.generation = self.bucket.generations.get(self.name, 1)
+        return data
+
+    download_as_string = download_as_bytes
+
+    def upload_from_string(self, data, content_type=None, if_generation_match=None, timeout=None):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.bucket.delay()
+        with self.bucket.lock:
+            current = self.bucket.generations.get(self.name, 1 if os.path.exists(self.path) else 0)
+            if if_generation_match is not None and if_generation_match != current:
+                raise PreconditionFailed(f"Generation mismatch for {self.name}")
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+            self.generation = current + 1
+            self.bucket.generations[self.name] = self.generation
+            self.bucket.bytes_written += len(data)
+
+    def upload_from_file(self, file_obj, content_type=None, size=None, if_generation_match=None,
+                         timeout=None):
+        data = file_obj.read(size) if size is not None else file_obj.read()
+        self.upload_from_string(data, content_type=content_type,
+                                if_generation_match=if_generation_match)
+
+
+class LocalBucket:
+    def __init__(self, root, latency=0.0):
+        self.root = root
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.generations = {}
+        self.bytes_written = 0
+        os.makedirs(root, exist_ok=True)
+
+    def delay(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def blob(self, name):
+        return LocalBlob(self, name)
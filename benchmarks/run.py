@@ -0,0 +1,250 @@
+"""Offline end-to-end benchmarks against the local fixture site.
+
+Runs each scenario in a fresh interpreter and working directory (so
+SQLite files, the Bloom filter and peak RSS are per scenario), against a
+FixtureSite served from this process and a LocalBucket instead of GCS:
+
+    storage         append_product for synthetic records (sink, catalog, seen index)
+    scrape_product  Scraper.scrape_product over HTTP (--browser: in Chrome)
+    search          Scraper.scrape_search_results through the fixture site (needs --browser)
+
+Reports items/sec, p50/p95 per-item latency and peak RSS per scenario,
+writes them as JSON to --output and, with --baseline, prints the change
+against an earlier results file.
+
+    python benchmarks/run.py --items 100 --latency 0.02 --failure-rate 0.01
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_site import FixtureSite, item_url
+from local_gcs import LocalBucket
+
+SCENARIOS = ('storage', 'scrape_product', 'search')
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None if unknown"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def latency_stats(latencies, elapsed):
+    result = {
+        'items': len(latencies),
+        'elapsed': round(elapsed, 3),
+        'items_per_sec': round(len(latencies) / elapsed, 2) if elapsed else None,
+    }
+    if len(latencies) >= 2:
+        percentiles = statistics.quantiles(latencies, n=100)
+        result['p50'] = round(percentiles[49], 4)
+        result['p95'] = round(percentiles[94], 4)
+    elif latencies:
+        result['p50'] = result['p95'] = round(latencies[0], 4)
+    return result
+
+
+def fake_record(i):
+    return {
+        'id': str(1_000_000 + i),
+        'scrape_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'url': f"https://www.vinted.com/items/{1_000_000 + i}-benchmark-item",
+        'title': f"Benchmark item {i}",
+        'brand': 'Zara',
+        'size': 'M',
+        'price': '$12.50',
+        'description': 'x' * 400,
+        'image_urls': [f"https://images.example/{i}/{n}.jpg" for n in range(4)],
+        'image_paths': [f"images/{i % 256:02x}/{i:064x}.jpg" for n in range(4)],
+        'seller_info': {'seller_name': f"seller{i % 50}", 'seller_location': 'Berlin, Germany'},
+    }
+
+
+def fast_scheduler():
+    """Scheduler that doesn't throttle, so the benchmark measures the pipeline"""
+    from scheduler import CrawlScheduler
+    return CrawlScheduler(rate=10_000, burst=10_000, concurrency=64, jitter=0)
+
+
+def run_storage(args):
+    from storage import VintedStorage
+    storage = VintedStorage('benchmark', bucket=LocalBucket('bucket', latency=args.gcs_latency))
+    latencies = []
+    start = time.perf_counter()
+    for i in range(args.items):
+        t0 = time.perf_counter()
+        storage.append_product(fake_record(i))
+        latencies.append(time.perf_counter() - t0)
+    storage.close()
+    return latency_stats(latencies, time.perf_counter() - start)
+
+
+def _scraper(args, site_url, fetch_mode):
+    """Scraper writing to a local bucket; close it with _close"""
+    from image_pipeline import ImagePipeline
+    from scraper import Scraper
+    from storage import VintedStorage
+    storage = VintedStorage('benchmark', bucket=LocalBucket('bucket', latency=args.gcs_latency))
+    scheduler = fast_scheduler()
+    images = ImagePipeline(storage, scheduler=scheduler)
+    return Scraper('benchmark', storage=storage, images=images, scheduler=scheduler,
+                   fetch_mode=fetch_mode, home_url=site_url)
+
+
+def _close(scraper):
+    """Close the scraper, then wait for its images and uploads"""
+    scraper.close()
+    scraper.images.close()
+    scraper.storage.close()
+    scraper.scheduler.close()
+
+
+def _timed(func, latencies):
+    def wrapper(*a, **kw):
+        t0 = time.perf_counter()
+        try:
+            return func(*a, **kw)
+        finally:
+            latencies.append(time.perf_counter() - t0)
+    return wrapper
+
+
+def run_scrape_product(args, site_url, item_urls):
+    scraper = _scraper(args, site_url, 'browser' if args.browser else 'http')
+    latencies = []
+    scrape = _timed(scraper.scrape_product, latencies)
+    start = time.perf_counter()
+    try:
+        failed = sum(scrape(url) is None for url in item_urls)
+    finally:
+        _close(scraper)
+    result = latency_stats(latencies, time.perf_counter() - start)
+    result['failed'] = failed
+    return result
+
+
+def run_search(args, site_url):
+    if not args.browser:
+        return {'skipped': "search needs a browser; pass --browser"}
+    scraper = _scraper(args, site_url, 'browser')
+    latencies = []
+    scraper.scrape_product = _timed(scraper.scrape_product, latencies)
+    start = time.perf_counter()
+    try:
+        scraper.scrape_search_results('benchmark', max_items=args.items, resume=False)
+    finally:
+        _close(scraper)
+    return latency_stats(latencies, time.perf_counter() - start)
+
+
+def run_child(args):
+    """Run one scenario in this process and write its result to --result-file"""
+    # Scraper output is noisy; keep stdout for errors only
+    sys.stdout = open(os.devnull, 'w')
+    if args.scenario == 'storage':
+        result = run_storage(args)
+    elif args.scenario == 'scrape_product':
+        item_urls = [item_url(args.site_url, i) for i in range(1, args.items + 1)]
+        result = run_scrape_product(args, args.site_url, item_urls)
+    else:
+        result = run_search(args, args.site_url)
+    result['peak_rss'] = peak_rss()
+    with open(args.result_file, 'w') as f:
+        json.dump(result, f)
+
+
+def run_scenario(scenario, args, site):
+    """Run a scenario in a fresh interpreter inside an empty working directory"""
+    with tempfile.TemporaryDirectory() as workdir:
+        result_file = os.path.join(workdir, 'result.json')
+        command = [
+            sys.executable, os.path.abspath(__file__), '--child', '--scenario', scenario,
+            '--result-file', result_file, '--site-url', site.url,
+            '--items', str(args.items), '--gcs-latency', str(args.gcs_latency),
+        ]
+        if args.browser:
+            command.append('--browser')
+        completed = subprocess.run(command, cwd=workdir, capture_output=True, text=True)
+        if completed.returncode != 0 or not os.path.exists(result_file):
+            lines = completed.stderr.strip().splitlines()
+            return {'error': lines[-1] if lines else f"exit code {completed.returncode}"}
+        with open(result_file) as f:
+            return json.load(f)
+
+
+def compare(results, baseline_path):
+    """Print the change in throughput and p95 latency against a baseline file"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    for scenario, result in results.items():
+        before = baseline.get(scenario) or {}
+        for key in ('items_per_sec', 'p95', 'peak_rss'):
+            if result.get(key) and before.get(key):
+                change = (result[key] - before[key]) / before[key] * 100
+                print(f"{scenario:15} {key:13} {before[key]:>12} -> {result[key]:>12} ({change:+.1f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline scraper benchmarks")
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument('--items', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.0, help="fixture response latency (s)")
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--gcs-latency', type=float, default=0.0, help="latency per bucket call (s)")
+    parser.add_argument('--recorded', help="directory with recorded pages to serve")
+    parser.add_argument('--browser', action='store_true', help="scrape in Chrome instead of over HTTP")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    # Internal: set when running a single scenario in a child process
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    parser.add_argument('--site-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.scenario = args.scenario[0]
+        run_child(args)
+        sys.exit(0)
+
+    site = FixtureSite(items=max(args.items, 50), latency=args.latency, jitter=args.jitter,
+                       failure_rate=args.failure_rate, recorded_dir=args.recorded)
+    results = {}
+    with site:
+        for scenario in args.scenario or SCENARIOS:
+            print(f"Running {scenario}...")
+            results[scenario] = run_scenario(scenario, args, site)
+            print(json.dumps(results[scenario]))
+        requests_served, failures = site.requests, site.failures
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {k: v for k, v in vars(args).items()
+                   if k not in ('child', 'result_file', 'site_url')},
+        'fixture': {'requests': requests_served, 'failures': failures},
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+    if args.baseline:
+        compare(results, args.baseline)
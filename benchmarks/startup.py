@@ -0,0 +1,64 @@
+"""Cold-start benchmark for the scraper.
+
+Each measurement runs in a fresh interpreter so nothing is already imported:
+module import time, Scraper construction (storage, catalog, image pipeline)
+and, with --launch, the first Chrome launch plus the ready() check.
+Prints one JSON object with the median of --runs runs per step (seconds).
+
+    python benchmarks/startup.py --runs 5 --launch
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STEPS = {
+    'import_scraper': 'import scraper',
+    'import_main': 'import main',
+    'construct': 'import scraper; s = scraper.Scraper(BUCKET); s.close()',
+    'launch': 'import scraper; s = scraper.Scraper(BUCKET); s.ready(); s.close()',
+}
+
+TIMER = '''
+import sys, time
+sys.path.insert(0, {root!r})
+BUCKET = {bucket!r}
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+'''
+
+
+def time_step(code, bucket):
+    """Seconds taken by code in a fresh interpreter, run in an empty directory"""
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(
+            [sys.executable, '-c', TIMER.format(root=ROOT, bucket=bucket, code=code)],
+            cwd=workdir, capture_output=True, text=True,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure scraper cold-start time")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--bucket', default='scrape_content')
+    parser.add_argument('--launch', action='store_true', help="also time the first Chrome launch")
+    args = parser.parse_args()
+
+    steps = [s for s in STEPS if s != 'launch' or args.launch]
+    results = {}
+    for step in steps:
+        try:
+            times = [time_step(STEPS[step], args.bucket) for _ in range(args.runs)]
+            results[step] = {'median': statistics.median(times), 'min': min(times), 'runs': times}
+        except Exception as e:
+            results[step] = {'error': str(e)}
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,265 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from extraction import item_id_from_url, parse_count, parse_price
+from records import dumps
+
+
+COLUMNS = (
+    'item_id', 'url', 'title', 'price', 'description', 'seller', 'likes', 'views',
+    'brand', 'size', 'condition', 'location', 'original_image_urls', 'gcs_paths',
+    'scraped_at', 'first_seen_at', 'raw_data',
+)
+
+# Columns refreshed when an item is scraped again (first_seen_at is kept)
+UPDATE_COLUMNS = [c for c in COLUMNS if c not in ('item_id', 'first_seen_at')]
+
+TILE_COLUMNS = (
+    'item_id', 'url', 'title', 'brand', 'size', 'condition', 'price', 'thumbnail_url',
+    'first_seen_at', 'last_seen_at',
+)
+
+
+def record_item_id(record):
+    """Numeric Vinted item ID of a scraped record, or None"""
+    record_id = str(record.get('id', ''))
+    if record_id.isdigit():
+        return int(record_id)
+    return item_id_from_url(record.get('url'))
+
+
+def record_to_row(record, raw=None):
+    """Flatten a scraped product record into a products table row
+
+    ``raw`` is the record already serialized with records.dumps, if it was.
+    """
+    seller_info = record.get('seller_info') or {}
+    return (
+        record_item_id(record),
+        record.get('url'),
+        record.get('title'),
+        parse_price(record.get('price')),
+        record.get('description'),
+        seller_info.get('seller_name') or record.get('seller'),
+        parse_count(record.get('likes') or record.get('favourites')),
+        parse_count(record.get('views')),
+        record.get('brand'),
+        record.get('size'),
+        record.get('condition'),
+        record.get('location') or seller_info.get('seller_location'),
+        json.dumps(record.get('image_urls') or [], ensure_ascii=False),
+        json.dumps(record.get('image_paths') or [], ensure_ascii=False),
+        record.get('scrape_time') or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        (raw or dumps(record)).decode('utf-8'),
+    )
+
+
+class ProductCatalog:
+    """Local SQLite catalog of every scraped product, keyed by Vinted item ID.
+
+    Runs in WAL mode so readers don't block the scraper. Upserts are
+    buffered and written with ``executemany`` in one transaction per
+    ``batch_size`` records (and on ``flush``/``close``).
+    """
+
+    def __init__(self, db_name="vinted_data.db", batch_size=100):
+        self.db_name = db_name
+        self.batch_size = batch_size
+        self._pending = []
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.setup_database()
+
+    def setup_database(self):
+        with self._lock:
+            c = self.conn.cursor()
+            c.execute('PRAGMA journal_mode=WAL')
+            c.execute('PRAGMA synchronous=NORMAL')
+
+            # The original table was keyed by a random uuid and never written
+            # to; replace it when empty, keep it aside otherwise
+            columns = [row[1] for row in c.execute('PRAGMA table_info(products)')]
+            if columns and 'item_id' not in columns:
+                if c.execute('SELECT COUNT(*) FROM products').fetchone()[0]:
+                    c.execute('ALTER TABLE products RENAME TO products_legacy')
+                else:
+                    c.execute('DROP TABLE products')
+
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS products (
+                    item_id INTEGER PRIMARY KEY,
+                    url TEXT,
+                    title TEXT,
+                    price REAL,
+                    description TEXT,
+                    seller TEXT,
+                    likes INTEGER,
+                    views INTEGER,
+                    brand TEXT,
+                    size TEXT,
+                    condition TEXT,
+                    location TEXT,
+                    original_image_urls TEXT,
+                    gcs_paths TEXT,
+                    scraped_at DATETIME,
+                    first_seen_at DATETIME,
+                    raw_data TEXT,
+                    write_seq INTEGER
+                )
+            ''')
+            self._add_write_seq(c)
+            c.execute('CREATE INDEX IF NOT EXISTS idx_products_brand ON products(brand)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_products_price ON products(price)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_products_seller ON products(seller)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_products_scraped_at ON products(scraped_at)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_products_write_seq ON products(write_seq)')
+
+            # Lightweight records harvested from catalog and search tiles
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS listings (
+                    item_id INTEGER PRIMARY KEY,
+                    url TEXT,
+                    title TEXT,
+                    brand TEXT,
+                    size TEXT,
+                    condition TEXT,
+                    price REAL,
+                    thumbnail_url TEXT,
+                    first_seen_at DATETIME,
+                    last_seen_at DATETIME,
+                    seen_count INTEGER DEFAULT 1
+                )
+            ''')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_listings_brand ON listings(brand)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_listings_price ON listings(price)')
+            self.conn.commit()
+
+    @staticmethod
+    def _add_write_seq(c):
+        """Add write_seq to an older products table, numbering rows in scrape order"""
+        columns = [row[1] for row in c.execute('PRAGMA table_info(products)')]
+        if 'write_seq' in columns:
+            return
+        c.execute('ALTER TABLE products ADD COLUMN write_seq INTEGER')
+        item_ids = c.execute('SELECT item_id FROM products ORDER BY scraped_at, item_id').fetchall()
+        c.executemany('UPDATE products SET write_seq = ? WHERE item_id = ?',
+                      [(seq, item_id) for seq, (item_id,) in enumerate(item_ids, 1)])
+
+    def upsert(self, record, raw=None, on_written=None):
+        """Queue a scraped record; written when the batch is full
+
+        ``on_written()`` is called once the batch holding the record has
+        been committed.
+        """
+        row = record_to_row(record, raw)
+        if row[0] is None:
+            print(f"Not cataloguing record without an item ID: {record.get('url')}")
+            if on_written is not None:
+                on_written()
+            return
+        callbacks = []
+        with self._lock:
+            self._pending.append(row)
+            if on_written is not None:
+                self._callbacks.append(on_written)
+            if len(self._pending) >= self.batch_size:
+                callbacks = self._write_pending()
+        self._run_callbacks(callbacks)
+
+    def flush(self):
+        with self._lock:
+            callbacks = self._write_pending()
+        self._run_callbacks(callbacks)
+
+    @staticmethod
+    def _run_callbacks(callbacks):
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in catalog write callback: {e}")
+
+    def _write_pending(self):
+        """Commit the pending rows; returns the callbacks waiting on them"""
+        if not self._pending:
+            return []
+        # write_seq numbers rows in the order they are written (not scraped),
+        # so incremental exports can't skip records that arrive late
+        placeholders = ', '.join('?' for _ in COLUMNS)
+        updates = ', '.join(f"{c} = excluded.{c}" for c in UPDATE_COLUMNS + ['write_seq'])
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO products ({', '.join(COLUMNS)}, write_seq) VALUES ({placeholders}, "
+                f"(SELECT COALESCE(MAX(write_seq), 0) + 1 FROM products)) "
+                f"ON CONFLICT(item_id) DO UPDATE SET {updates}",
+                self._pending,
+            )
+        self._pending = []
+        callbacks, self._callbacks = self._callbacks, []
+        return callbacks
+
+    def upsert_tiles(self, records):
+        """Write tile records to the listings table in one transaction
+
+        Returns {item_id: price} with the previous price of items already listed.
+        """
+        rows = []
+        for record in records:
+            item_id = record_item_id(record)
+            if item_id is None:
+                continue
+            seen_at = record.get('scrape_time') or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            rows.append((
+                item_id, record.get('url'), record.get('title'), record.get('brand'),
+                record.get('size'), record.get('condition'), parse_price(record.get('price')),
+                record.get('thumbnail_url'), seen_at, seen_at,
+            ))
+        if not rows:
+            return {}
+        ids = [row[0] for row in rows]
+        placeholders = ', '.join('?' for _ in TILE_COLUMNS)
+        updates = ', '.join(f"{c} = excluded.{c}" for c in TILE_COLUMNS
+                            if c not in ('item_id', 'first_seen_at'))
+        with self._lock:
+            previous = {}
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                previous.update(self.conn.execute(
+                    f"SELECT item_id, price FROM listings WHERE item_id IN ({', '.join('?' for _ in chunk)})",
+                    chunk,
+                ).fetchall())
+            with self.conn:
+                self.conn.executemany(
+                    f"INSERT INTO listings ({', '.join(TILE_COLUMNS)}) VALUES ({placeholders}) "
+                    f"ON CONFLICT(item_id) DO UPDATE SET {updates}, seen_count = seen_count + 1",
+                    rows,
+                )
+        return previous
+
+    def has(self, item_id):
+        """Whether an item is already in the catalog"""
+        self.flush()
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT 1 FROM products WHERE item_id = ?', (item_id,)
+            ).fetchone()
+        return row is not None
+
+    def get(self, item_id):
+        """Stored record for an item as a dict, or None"""
+        self.flush()
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT raw_data FROM products WHERE item_id = ?', (item_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,237 @@
+import argparse
+import csv
+import json
+import re
+import sqlite3
+import uuid
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from catalog import ProductCatalog, record_item_id
+from extraction import parse_count, parse_price
+from records import SELLER_FIELDS, loads
+
+SCHEMA = pa.schema([
+    ('item_id', pa.int64()),
+    ('url', pa.string()),
+    ('title', pa.string()),
+    ('brand', pa.string()),
+    ('size', pa.string()),
+    ('condition', pa.string()),
+    ('color', pa.string()),
+    ('location', pa.string()),
+    ('description', pa.string()),
+    ('breadcrumbs', pa.string()),
+    ('price', pa.float64()),
+    ('currency', pa.string()),
+    ('buyer_protection', pa.float64()),
+    ('shipping', pa.float64()),
+    ('views', pa.int32()),
+    ('likes', pa.int32()),
+    ('uploaded', pa.string()),
+    ('payment_options', pa.string()),
+    ('image_count', pa.int32()),
+    ('image_urls', pa.list_(pa.string())),
+    ('image_paths', pa.list_(pa.string())),
+] + [(field, pa.string()) for field in SELLER_FIELDS] + [
+    ('scrape_time', pa.timestamp('s')),
+    ('scrape_date', pa.string()),
+    ('category', pa.string()),
+])
+
+CURRENCY_SYMBOLS = {'$': 'USD', '€': 'EUR', '£': 'GBP', 'zł': 'PLN', 'Kč': 'CZK'}
+
+
+def _currency(text):
+    if not text:
+        return None
+    for symbol, code in CURRENCY_SYMBOLS.items():
+        if symbol in text:
+            return code
+    match = re.search(r'\b([A-Z]{3})\b', text)
+    return match.group(1) if match else None
+
+
+def _category(record):
+    """Top-level category from breadcrumbs like 'Home > Women > Beauty > ...'
+
+    Sanitised so it is safe to use as a partition directory name.
+    """
+    category = record.get('category')
+    if not category:
+        crumbs = [c.strip() for c in (record.get('breadcrumbs') or '').split('>') if c.strip()]
+        if crumbs and crumbs[0].lower() == 'home':
+            crumbs = crumbs[1:]
+        category = crumbs[0] if crumbs else 'unknown'
+    return re.sub(r'[^\w-]+', '_', category).strip('_') or 'unknown'
+
+
+def _as_list(value):
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = [value] if value else []
+    return list(value or [])
+
+
+def flatten_record(record):
+    """Typed, flat row for one scraped product record"""
+    scrape_time = datetime.strptime(record['scrape_time'], '%Y-%m-%d %H:%M:%S') \
+        if record.get('scrape_time') else datetime.now().replace(microsecond=0)
+    seller_info = record.get('seller_info') or {}
+    image_paths = _as_list(record.get('image_paths'))
+    row = {
+        'item_id': record_item_id(record),
+        'url': record.get('url'),
+        'title': record.get('title'),
+        'brand': record.get('brand'),
+        'size': record.get('size'),
+        'condition': record.get('condition'),
+        'color': record.get('color') or record.get('colour'),
+        'location': record.get('location'),
+        'description': record.get('description'),
+        'breadcrumbs': record.get('breadcrumbs'),
+        'price': parse_price(record.get('price')),
+        'currency': _currency(record.get('price')),
+        'buyer_protection': parse_price(record.get('buyer_protection')),
+        'shipping': parse_price(record.get('shipping')),
+        'views': parse_count(record.get('views')),
+        'likes': parse_count(record.get('likes') or record.get('interested')),
+        'uploaded': record.get('uploaded'),
+        'payment_options': record.get('payment_options'),
+        'image_count': record.get('image_count', len(image_paths)),
+        'image_urls': _as_list(record.get('image_urls')),
+        'image_paths': image_paths,
+        'scrape_time': scrape_time,
+        'scrape_date': scrape_time.strftime('%Y-%m-%d'),
+        'category': _category(record),
+    }
+    for field in SELLER_FIELDS:
+        # Legacy CSVs have the seller fields at the top level already
+        row[field] = seller_info.get(field, record.get(field)) or None
+    return row
+
+
+def write_partitioned(records, output_dir, compression='zstd'):
+    """Append records to a Parquet dataset partitioned by scrape_date and category"""
+    rows = [flatten_record(r) for r in records]
+    if not rows:
+        return 0
+    table = pa.Table.from_pylist(rows, schema=SCHEMA)
+    ds.write_dataset(
+        table,
+        output_dir,
+        format='parquet',
+        partitioning=ds.partitioning(
+            pa.schema([('scrape_date', pa.string()), ('category', pa.string())]),
+            flavor='hive',
+        ),
+        # A fresh basename per call so incremental runs add files instead of replacing them
+        basename_template=f"part-{uuid.uuid4().hex[:12]}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+    )
+    return len(rows)
+
+
+class ParquetExporter:
+    """Incrementally export the local products catalog to Parquet.
+
+    Keeps a write_seq watermark in the export_state table, so each run only
+    reads and appends records written to the catalog since the last one,
+    whatever their scrape time. Re-scraped items are exported again as a
+    newer snapshot.
+    """
+
+    def __init__(self, output_dir, db_name="vinted_data.db", batch_size=50_000, name='parquet'):
+        self.output_dir = output_dir
+        self.batch_size = batch_size
+        self.name = name
+        # Creates or migrates the products table (write_seq)
+        ProductCatalog(db_name).close()
+        self.conn = sqlite3.connect(db_name)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS export_state (
+                name TEXT PRIMARY KEY,
+                scraped_at DATETIME,
+                item_id INTEGER,
+                exported_at DATETIME,
+                write_seq INTEGER
+            )
+        ''')
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(export_state)')]
+        if 'write_seq' not in columns:
+            self.conn.execute('ALTER TABLE export_state ADD COLUMN write_seq INTEGER')
+        self.conn.commit()
+
+    def _watermark(self):
+        row = self.conn.execute(
+            'SELECT write_seq, scraped_at, item_id FROM export_state WHERE name = ?', (self.name,)
+        ).fetchone()
+        if row is None:
+            return 0
+        write_seq, scraped_at, item_id = row
+        if write_seq is None:
+            # State from the old (scraped_at, item_id) watermark; the catalog
+            # migration numbered existing rows in that order
+            write_seq = self.conn.execute(
+                'SELECT COALESCE(MAX(write_seq), 0) FROM products WHERE (scraped_at, item_id) <= (?, ?)',
+                (scraped_at or '', item_id or 0)).fetchone()[0]
+        return write_seq
+
+    def run(self):
+        """Export everything written since the watermark; returns the row count"""
+        write_seq = self._watermark()
+        exported = 0
+        while True:
+            rows = self.conn.execute('''
+                SELECT write_seq, raw_data FROM products
+                WHERE write_seq > ?
+                ORDER BY write_seq
+                LIMIT ?
+            ''', (write_seq, self.batch_size)).fetchall()
+            if not rows:
+                break
+            exported += write_partitioned((loads(r[1]) for r in rows), self.output_dir)
+            write_seq = rows[-1][0]
+            self.conn.execute('''
+                INSERT OR REPLACE INTO export_state (name, write_seq, exported_at)
+                VALUES (?, ?, ?)
+            ''', (self.name, write_seq, datetime.now().isoformat()))
+            self.conn.commit()
+        print(f"Exported {exported} records to {self.output_dir}")
+        return exported
+
+    def close(self):
+        self.conn.close()
+
+
+def records_from_csv(path):
+    """Read an ad-hoc CSV export like vinted_products_20250208.csv as records"""
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            record = {k: (v if v != '' else None) for k, v in row.items()}
+            if record.get('scrape_time'):
+                record['scrape_time'] = record['scrape_time'][:19]
+            yield record
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export scraped products to partitioned Parquet")
+    parser.add_argument('output_dir')
+    parser.add_argument('--db', default="vinted_data.db")
+    parser.add_argument('--csv', nargs='*', default=[], help="also import legacy CSV exports")
+    args = parser.parse_args()
+
+    for csv_path in args.csv:
+        count = write_partitioned(records_from_csv(csv_path), args.output_dir)
+        print(f"Imported {count} records from {csv_path}")
+
+    exporter = ParquetExporter(args.output_dir, args.db)
+    try:
+        exporter.run()
+    finally:
+        exporter.close()
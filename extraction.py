@@ -0,0 +1,182 @@
+"""Selectors, the in-page script and value parsers for product pages.
+
+The selectors are shared by every extraction mode so that they only have to
+be updated in one place when Vinted changes its layout.
+"""
+import re
+
+MAIN_INFO_CLASS = "details-list--main-info"
+IMAGE_SELECTOR = ".item-photos img.web_ui__Image__content"
+
+DESCRIPTION_XPATH = '/html/body/div[1]/div/main/div/div[1]/div/div[2]/div/div/main/div[1]/aside/div[2]/div[1]/div/div/div/div/div/div[2]/div[3]/div/div/div[1]/div/span/span'
+
+# seller_info key -> XPath of the element in the sidebar
+SELLER_XPATHS = {
+    'seller_name': '//*[@id="sidebar"]/div[2]/div[3]/div/a/div[2]/div[1]/div/div/span',
+    'seller_image': '//*[@id="sidebar"]/div[2]/div[3]/div/a/div[2]/div[1]/div/div/span',
+    'seller_ratings': '//*[@id="sidebar"]/div[2]/div[3]/div/a/div[2]/div[2]/div/div[6]/h4',
+    'seller_rating': '//*[@id="sidebar"]/div[2]/div[3]/div/a/div[2]/div[2]/div',
+    'upload_frequency': '//*[@id="sidebar"]/div[2]/div[3]/div/div[2]/div/div[2]/div[1]/div',
+    'seller_location': '//*[@id="sidebar"]/div[2]/div[3]/div/div[4]/div/div/div[1]/div[2]',
+}
+
+# seller_info keys read from an attribute instead of the element text
+SELLER_ATTRIBUTES = {'seller_image': 'src'}
+
+# Items of the breadcrumb trail above the item, e.g. Home > Women > Clothing > Dresses
+BREADCRUMB_SELECTOR = ".breadcrumbs__item"
+
+
+# Collects the whole product payload in a single WebDriver round trip.
+# Mirrors Scraper._extract_details_from_container and the seller block in
+# Scraper._extract_product_dom; returns null when the page has no main info.
+PRODUCT_SCRIPT = r"""
+const mainInfoClass = arguments[0];
+const imageSelector = arguments[1];
+const descriptionXPath = arguments[2];
+const sellerXPaths = arguments[3];
+const sellerAttributes = arguments[4];
+const breadcrumbSelector = arguments[5];
+
+const text = el => (el ? (el.innerText || '').trim() : '');
+const byXPath = xp => document.evaluate(
+    xp, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+
+const mainInfo = document.getElementsByClassName(mainInfoClass)[0];
+if (!mainInfo) {
+    return null;
+}
+
+const details = {};
+for (const list of mainInfo.parentElement.getElementsByClassName('details-list')) {
+    const cls = list.getAttribute('class') || '';
+    if (cls.includes('details-list--main-info')) {
+        const title = list.getElementsByClassName('web_ui__Text__title')[0];
+        if (title) details.title = text(title);
+        const summary = list.getElementsByClassName('summary-max-lines-4')[0];
+        if (summary) {
+            for (const t of summary.getElementsByClassName('web_ui__Text__text')) {
+                if (text(t).includes('Very good')) {
+                    details.condition = text(t);
+                } else if ((t.getAttribute('class') || '').includes('clickable')) {
+                    details.brand = text(t);
+                }
+            }
+        }
+    } else if (cls.includes('details-list--pricing')) {
+        const price = list.querySelector("[data-testid='item-price'] p");
+        if (price) {
+            details.price = text(price);
+            const protection = list.querySelector("[data-testid='service-fee-included-title']");
+            if (protection) details.buyer_protection = text(protection);
+        }
+    } else {
+        for (const item of list.getElementsByClassName('details-list__item')) {
+            const labelEl = item.querySelector('.details-list__item-value:first-child');
+            const valueEl = item.querySelector('.details-list__item-value:last-child');
+            if (!labelEl || !valueEl) continue;
+            const label = text(labelEl).replace(/:+$/, '').toLowerCase();
+            const value = text(valueEl);
+            if (label && value) details[label] = value;
+        }
+    }
+}
+
+const imageUrls = [];
+for (const img of document.querySelectorAll(imageSelector)) {
+    const src = img.getAttribute('src') ? img.src : null;
+    if (src) imageUrls.push(src);
+}
+
+const sellerInfo = {};
+for (const [key, xp] of Object.entries(sellerXPaths)) {
+    const el = byXPath(xp);
+    const attr = sellerAttributes[key];
+    if (attr) {
+        sellerInfo[key] = el ? (el[attr] || el.getAttribute(attr)) : null;
+    } else {
+        sellerInfo[key] = text(el);
+    }
+}
+
+const breadcrumbs = Array.from(document.querySelectorAll(breadcrumbSelector))
+    .map(text).filter(Boolean).join(' > ');
+
+return {
+    details: details,
+    image_urls: imageUrls,
+    description: text(byXPath(descriptionXPath)),
+    seller_info: sellerInfo,
+    breadcrumbs: breadcrumbs,
+};
+"""
+
+
+# Catalog and search result tiles: the item link, and the tile fields read
+# from the tile box around it (the link's title attribute has the rest)
+TILE_SELECTOR = "#content div.new-item-box__image-container > a"
+SEARCH_TILE_SELECTOR = "a[class*='item-link']"
+TILE_BOX_SELECTOR = ".new-item-box__container"
+TILE_FIELDS = {
+    'brand': "[data-testid$='--description-title']",
+    'subtitle': "[data-testid$='--description-subtitle']",
+    'price': "[data-testid$='--price-text']",
+}
+
+# Collects every tile on a listing page in a single WebDriver round trip
+TILE_SCRIPT = r"""
+const tileSelector = arguments[0];
+const boxSelector = arguments[1];
+const fields = arguments[2];
+
+const text = el => (el ? (el.innerText || '').trim() : '');
+
+const tiles = [];
+for (const link of document.querySelectorAll(tileSelector)) {
+    const box = link.closest(boxSelector) || link.parentElement.parentElement || link.parentElement;
+    const tile = {url: link.href, title: link.getAttribute('title') || text(link)};
+    for (const [key, selector] of Object.entries(fields)) {
+        tile[key] = text(box.querySelector(selector));
+    }
+    const img = box.querySelector('img');
+    tile.thumbnail_url = img && img.getAttribute('src') ? img.src : null;
+    tiles.push(tile);
+}
+return tiles;
+"""
+
+
+_ITEM_ID = re.compile(r'/items/(\d+)')
+
+
+def item_id_from_url(url):
+    """Vinted's numeric item ID from an /items/<id>-slug URL, or None"""
+    match = _ITEM_ID.search(url or '')
+    return int(match.group(1)) if match else None
+
+
+def parse_price(text):
+    """Parse a displayed price like '$3.25' or '3,25 €' into a float, or None"""
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+    digits = re.sub(r'[^\d.,]', '', str(text))
+    if not digits:
+        return None
+    # Treat the last separator as the decimal point when followed by 1-2 digits
+    match = re.match(r'^(.*?)[.,](\d{1,2})$', digits)
+    if match:
+        whole = re.sub(r'[.,]', '', match.group(1)) or '0'
+        return float(f"{whole}.{match.group(2)}")
+    return float(re.sub(r'[.,]', '', digits))
+
+
+def parse_count(text):
+    """Parse a displayed count like '14' or '1,204 views' into an int, or None"""
+    if text is None:
+        return None
+    if isinstance(text, int):
+        return text
+    digits = ''.join(filter(str.isdigit, str(text)))
+    return int(digits) if digits else None
@@ -0,0 +1,151 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+PENDING = 'pending'
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class CrawlFrontier:
+    """Persistent crawl frontier for one named crawl.
+
+    Keeps every discovered URL with its state (pending / in_progress / done /
+    failed) and the crawl's pagination cursor in SQLite. Every state change
+    is committed right away, which acts as the checkpoint: after a crash,
+    ``recover()`` puts interrupted URLs back to pending and ``load_cursor()``
+    returns the page the crawl had reached.
+    """
+
+    def __init__(self, crawl_id, db_name="vinted_data.db", max_attempts=3):
+        self.crawl_id = crawl_id
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.setup_database()
+
+    def setup_database(self):
+        with self._lock:
+            c = self.conn.cursor()
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS frontier_urls (
+                    crawl_id TEXT,
+                    url TEXT,
+                    state TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    discovered_at DATETIME,
+                    updated_at DATETIME,
+                    error TEXT,
+                    PRIMARY KEY (crawl_id, url)
+                )
+            ''')
+            c.execute('''
+                CREATE INDEX IF NOT EXISTS idx_frontier_state
+                ON frontier_urls(crawl_id, state, discovered_at)
+            ''')
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS frontier_cursors (
+                    crawl_id TEXT PRIMARY KEY,
+                    cursor TEXT,
+                    updated_at DATETIME
+                )
+            ''')
+            self.conn.commit()
+
+    def recover(self):
+        """Return URLs left in progress by a crashed run to pending"""
+        with self._lock:
+            count = self.conn.execute('''
+                UPDATE frontier_urls SET state = ?, updated_at = ?
+                WHERE crawl_id = ? AND state = ?
+            ''', (PENDING, datetime.now().isoformat(), self.crawl_id, IN_PROGRESS)).rowcount
+            self.conn.commit()
+        if count:
+            print(f"Recovered {count} interrupted URLs for {self.crawl_id}")
+        return count
+
+    def add(self, urls):
+        """Add discovered URLs as pending; already known URLs are left alone"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            before = self.conn.total_changes
+            self.conn.executemany('''
+                INSERT OR IGNORE INTO frontier_urls (crawl_id, url, state, discovered_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(self.crawl_id, url, PENDING, now, now) for url in urls])
+            self.conn.commit()
+            return self.conn.total_changes - before
+
+    def claim(self, limit=1):
+        """Mark up to ``limit`` pending URLs in progress and return them"""
+        with self._lock:
+            rows = self.conn.execute('''
+                SELECT url FROM frontier_urls
+                WHERE crawl_id = ? AND state = ?
+                ORDER BY discovered_at
+                LIMIT ?
+            ''', (self.crawl_id, PENDING, limit)).fetchall()
+            urls = [row[0] for row in rows]
+            self.conn.executemany('''
+                UPDATE frontier_urls SET state = ?, attempts = attempts + 1, updated_at = ?
+                WHERE crawl_id = ? AND url = ?
+            ''', [(IN_PROGRESS, datetime.now().isoformat(), self.crawl_id, url) for url in urls])
+            self.conn.commit()
+        return urls
+
+    def complete(self, url):
+        self._set_state(url, DONE)
+
+    def fail(self, url, error=None):
+        """Put a URL back to pending, or mark it failed after max_attempts"""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT attempts FROM frontier_urls WHERE crawl_id = ? AND url = ?',
+                (self.crawl_id, url)).fetchone()
+        attempts = row[0] if row else self.max_attempts
+        self._set_state(url, FAILED if attempts >= self.max_attempts else PENDING, error)
+
+    def _set_state(self, url, state, error=None):
+        with self._lock:
+            self.conn.execute('''
+                UPDATE frontier_urls SET state = ?, error = ?, updated_at = ?
+                WHERE crawl_id = ? AND url = ?
+            ''', (state, error, datetime.now().isoformat(), self.crawl_id, url))
+            self.conn.commit()
+
+    def counts(self):
+        """Number of URLs in each state"""
+        with self._lock:
+            rows = self.conn.execute('''
+                SELECT state, COUNT(*) FROM frontier_urls WHERE crawl_id = ? GROUP BY state
+            ''', (self.crawl_id,)).fetchall()
+        return dict(rows)
+
+    def save_cursor(self, cursor):
+        """Checkpoint the pagination position (any JSON-serialisable dict)"""
+        with self._lock:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO frontier_cursors (crawl_id, cursor, updated_at)
+                VALUES (?, ?, ?)
+            ''', (self.crawl_id, json.dumps(cursor), datetime.now().isoformat()))
+            self.conn.commit()
+
+    def load_cursor(self):
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT cursor FROM frontier_cursors WHERE crawl_id = ?', (self.crawl_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def reset(self):
+        """Forget this crawl's URLs and cursor to start it from scratch"""
+        with self._lock:
+            self.conn.execute('DELETE FROM frontier_urls WHERE crawl_id = ?', (self.crawl_id,))
+            self.conn.execute('DELETE FROM frontier_cursors WHERE crawl_id = ?', (self.crawl_id,))
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
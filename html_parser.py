@@ -0,0 +1,227 @@
+import json
+import os
+import re
+import sys
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from urllib.parse import urljoin
+
+from lxml import html as lxml_html
+
+import extraction
+
+
+def _has_class(name):
+    """XPath predicate matching elements whose class list contains ``name``"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_WHITESPACE = re.compile(r'[ \t\r\f\v]+')
+
+
+def _text(element):
+    """Approximate Selenium's element.text for a parsed element"""
+    if element is None:
+        return ''
+    text = _WHITESPACE.sub(' ', element.text_content())
+    return '\n'.join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def _first(elements):
+    return elements[0] if elements else None
+
+
+def _extract_details(container):
+    """Offline equivalent of Scraper._extract_details_from_container"""
+    details = {}
+    for details_list in container.xpath(f".//*[{_has_class('details-list')}]"):
+        class_name = details_list.get('class', '')
+
+        if 'details-list--main-info' in class_name:
+            title = _first(details_list.xpath(f".//*[{_has_class('web_ui__Text__title')}]"))
+            if title is not None:
+                details['title'] = _text(title)
+
+            summary = _first(details_list.xpath(f".//*[{_has_class('summary-max-lines-4')}]"))
+            if summary is not None:
+                for text in summary.xpath(f".//*[{_has_class('web_ui__Text__text')}]"):
+                    if 'Very good' in _text(text):
+                        details['condition'] = _text(text)
+                    elif 'clickable' in text.get('class', ''):
+                        details['brand'] = _text(text)
+
+        elif 'details-list--pricing' in class_name:
+            price = _first(details_list.xpath(".//*[@data-testid='item-price']//p"))
+            if price is not None:
+                details['price'] = _text(price)
+                protection = _first(details_list.xpath(".//*[@data-testid='service-fee-included-title']"))
+                if protection is not None:
+                    details['buyer_protection'] = _text(protection)
+
+        else:
+            value_class = _has_class('details-list__item-value')
+            for item in details_list.xpath(f".//*[{_has_class('details-list__item')}]"):
+                label = _first(item.xpath(f".//*[{value_class}][not(preceding-sibling::*)]"))
+                value = _first(item.xpath(f".//*[{value_class}][not(following-sibling::*)]"))
+                if label is None or value is None:
+                    continue
+                label = _text(label).rstrip(':').lower()
+                value = _text(value)
+                if label and value:
+                    details[label] = value
+    return details
+
+
+def parse_breadcrumbs(tree):
+    """Breadcrumb trail of a parsed item page as 'Home > Women > ...', or ''
+
+    Reads extraction.BREADCRUMB_SELECTOR items, else a JSON-LD BreadcrumbList.
+    """
+    crumbs = [_text(item) for item in tree.xpath(f"//*[{_has_class('breadcrumbs__item')}]")]
+    if not any(crumbs):
+        for script in tree.xpath("//script[@type='application/ld+json']"):
+            try:
+                data = json.loads(script.text_content())
+            except ValueError:
+                continue
+            for node in data if isinstance(data, list) else [data]:
+                if isinstance(node, dict) and node.get('@type') == 'BreadcrumbList':
+                    crumbs = []
+                    for element in sorted(node.get('itemListElement') or [],
+                                          key=lambda e: e.get('position', 0)):
+                        item = element.get('item')
+                        name = item.get('name') if isinstance(item, dict) else None
+                        crumbs.append(str(name or element.get('name') or ''))
+                    break
+    return ' > '.join(c for c in crumbs if c)
+
+
+def parse_product_html(page_source, base_url=None):
+    """Parse a product page into the same payload as Scraper._extract_product_script
+
+    Returns None when the page has no main product info.
+    """
+    tree = lxml_html.fromstring(page_source)
+    main_info = _first(tree.xpath(f"//*[{_has_class(extraction.MAIN_INFO_CLASS)}]"))
+    if main_info is None:
+        return None
+
+    image_urls = []
+    image_xpath = (f"//*[{_has_class('item-photos')}]"
+                   f"//img[{_has_class('web_ui__Image__content')}]")
+    for img in tree.xpath(image_xpath):
+        src = img.get('src')
+        if src:
+            image_urls.append(urljoin(base_url, src) if base_url else src)
+
+    seller_info = {}
+    for key, xpath in extraction.SELLER_XPATHS.items():
+        element = _first(tree.xpath(xpath))
+        attribute = extraction.SELLER_ATTRIBUTES.get(key)
+        if attribute:
+            seller_info[key] = element.get(attribute) if element is not None else None
+        else:
+            seller_info[key] = _text(element)
+
+    return {
+        'details': _extract_details(main_info.getparent()),
+        'image_urls': image_urls,
+        'description': _text(_first(tree.xpath(extraction.DESCRIPTION_XPATH))),
+        'seller_info': seller_info,
+        'breadcrumbs': parse_breadcrumbs(tree),
+    }
+
+
+# Offline equivalents of extraction.TILE_SELECTOR / SEARCH_TILE_SELECTOR and TILE_FIELDS
+TILE_LINK_XPATH = (f"//*[@id='content']//div[{_has_class('new-item-box__image-container')}]/a"
+                   f" | //a[contains(@class, 'item-link')]")
+TILE_FIELD_XPATHS = {
+    'brand': ".//*[contains(@data-testid, '--description-title')]",
+    'subtitle': ".//*[contains(@data-testid, '--description-subtitle')]",
+    'price': ".//*[contains(@data-testid, '--price-text')]",
+}
+
+
+def parse_tiles(page_source, base_url=None):
+    """Parse the tiles of a catalog or search page like extraction.TILE_SCRIPT"""
+    tree = lxml_html.fromstring(page_source)
+    tiles = []
+    for link in tree.xpath(TILE_LINK_XPATH):
+        href = link.get('href')
+        if not href:
+            continue
+        box = _first(link.xpath(f"ancestor::*[{_has_class('new-item-box__container')}][1]"))
+        if box is None:
+            parent = link.getparent()
+            box = parent.getparent() if parent.getparent() is not None else parent
+        tile = {
+            'url': urljoin(base_url, href) if base_url else href,
+            'title': link.get('title') or _text(link),
+        }
+        for key, xpath in TILE_FIELD_XPATHS.items():
+            tile[key] = _text(_first(box.xpath(xpath)))
+        img = _first(box.xpath('.//img[@src]'))
+        src = img.get('src') if img is not None else None
+        tile['thumbnail_url'] = urljoin(base_url, src) if src and base_url else src
+        tiles.append(tile)
+    return tiles
+
+
+def page_url(page_source):
+    """Best-effort product URL from a saved page (canonical link or og:url)"""
+    tree = lxml_html.fromstring(page_source)
+    url = _first(tree.xpath("//link[@rel='canonical']/@href")) or \
+        _first(tree.xpath("//meta[@property='og:url']/@content"))
+    return url
+
+
+def product_record(page_source, product_url=None, scrape_time=None):
+    """Build a product record like Scraper.scrape_product from raw HTML"""
+    product_url = product_url or page_url(page_source)
+    payload = parse_product_html(page_source, product_url)
+    if payload is None:
+        return None
+
+    product_data = {
+        'id': str(extraction.item_id_from_url(product_url) or uuid.uuid4()),
+        'scrape_time': scrape_time or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'url': product_url,
+    }
+    product_data.update(payload['details'])
+    if payload['image_urls']:
+        product_data['image_urls'] = payload['image_urls']
+    if payload['description']:
+        product_data['description'] = payload['description']
+    product_data['seller_info'] = payload['seller_info']
+    if payload['breadcrumbs']:
+        product_data['breadcrumbs'] = payload['breadcrumbs']
+    return product_data
+
+
+def _parse_file(path):
+    with open(path, 'rb') as f:
+        page_source = f.read()
+    scrape_time = datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d %H:%M:%S')
+    try:
+        return path, product_record(page_source, scrape_time=scrape_time)
+    except Exception as e:
+        print(f"Error parsing {path}: {e}", file=sys.stderr)
+        return path, None
+
+
+def parse_files(paths, workers=None, chunksize=8):
+    """Re-parse saved product pages across all cores
+
+    Yields (path, record) pairs in input order; record is None for pages
+    that could not be parsed.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_parse_file, paths, chunksize=chunksize)
+
+
+if __name__ == "__main__":
+    # Usage: python html_parser.py page1.html page2.html ... > products.jsonl
+    for path, record in parse_files(sys.argv[1:]):
+        if record is not None:
+            print(json.dumps(record, ensure_ascii=False))
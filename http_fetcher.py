@@ -0,0 +1,232 @@
+import json
+
+import httpx
+from lxml import html as lxml_html
+
+import html_parser
+from scheduler import default_scheduler
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+def _find_item(node):
+    """Depth-first search of embedded state for the item object"""
+    if isinstance(node, dict):
+        if 'title' in node and 'price' in node and ('photos' in node or 'brand_title' in node):
+            return node
+        for value in node.values():
+            found = _find_item(value)
+            if found is not None:
+                return found
+    elif isinstance(node, list):
+        for value in node:
+            found = _find_item(value)
+            if found is not None:
+                return found
+    return None
+
+
+def _format_price(price):
+    if isinstance(price, dict):
+        amount = price.get('amount')
+        currency = price.get('currency_code', '')
+        return f"{amount} {currency}".strip() if amount is not None else ''
+    return str(price) if price is not None else ''
+
+
+def _payload_from_state(item):
+    """Map an embedded-state item object onto the extraction payload"""
+    details = {}
+    for key, source in (('title', 'title'), ('brand', 'brand_title'),
+                        ('size', 'size_title'), ('condition', 'status')):
+        if item.get(source):
+            details[key] = str(item[source])
+    if item.get('price') is not None:
+        details['price'] = _format_price(item['price'])
+
+    image_urls = []
+    for photo in item.get('photos') or []:
+        url = photo.get('full_size_url') or photo.get('url')
+        if url:
+            image_urls.append(url)
+
+    user = item.get('user') or {}
+    photo = user.get('photo') or {}
+    seller_info = {
+        'seller_name': user.get('login', ''),
+        'seller_image': photo.get('url'),
+        'seller_ratings': str(user.get('feedback_count', '') or ''),
+        'seller_rating': str(user.get('feedback_reputation', '') or ''),
+        'upload_frequency': '',
+        'seller_location': ', '.join(p for p in (user.get('city'), user.get('country_title')) if p),
+    }
+    return {
+        'details': details,
+        'image_urls': image_urls,
+        'description': item.get('description') or '',
+        'seller_info': seller_info,
+    }
+
+
+def _find_listing_items(node, found):
+    """Collect catalog item objects (with an /items/ url) from embedded state"""
+    if isinstance(node, dict):
+        if '/items/' in str(node.get('url', '')) and 'title' in node and 'price' in node:
+            found.append(node)
+            return found
+        for value in node.values():
+            _find_listing_items(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _find_listing_items(value, found)
+    return found
+
+
+def _tile_from_state(item):
+    """Map an embedded-state catalog item onto a TILE_SCRIPT tile"""
+    photo = item.get('photo') or {}
+    subtitle = ' · '.join(str(item[k]) for k in ('size_title', 'status') if item.get(k))
+    return {
+        'url': item['url'],
+        'title': item.get('title') or '',
+        'brand': item.get('brand_title') or '',
+        'subtitle': subtitle,
+        'price': _format_price(item.get('price')),
+        'thumbnail_url': photo.get('url'),
+    }
+
+
+def parse_listing(page_source, base_url=None):
+    """Tiles of a served catalog/search page: from the HTML, else from embedded state"""
+    tiles = html_parser.parse_tiles(page_source, base_url)
+    if tiles:
+        return tiles
+    tree = lxml_html.fromstring(page_source)
+    for script in tree.xpath("//script[@type='application/json' or @id='__NEXT_DATA__']"):
+        try:
+            items = _find_listing_items(json.loads(script.text_content()), [])
+        except ValueError:
+            continue
+        if items:
+            return [_tile_from_state(item) for item in items]
+    return []
+
+
+def _payload_from_json_ld(product):
+    """Map a schema.org Product (JSON-LD) onto the extraction payload"""
+    details = {}
+    if product.get('name'):
+        details['title'] = product['name']
+    brand = product.get('brand')
+    if isinstance(brand, dict):
+        brand = brand.get('name')
+    if brand:
+        details['brand'] = brand
+    offers = product.get('offers') or {}
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+    if offers.get('price') is not None:
+        details['price'] = f"{offers['price']} {offers.get('priceCurrency', '')}".strip()
+    condition = product.get('itemCondition') or offers.get('itemCondition')
+    if condition:
+        details['condition'] = condition.rsplit('/', 1)[-1]
+
+    images = product.get('image') or []
+    if isinstance(images, str):
+        images = [images]
+    return {
+        'details': details,
+        'image_urls': list(images),
+        'description': product.get('description') or '',
+        'seller_info': {},
+    }
+
+
+def parse_embedded_state(page_source):
+    """Extract the product payload from JSON embedded in the served HTML
+
+    Looks at JSON state scripts (e.g. __NEXT_DATA__) first and falls back to
+    schema.org JSON-LD. Returns None if neither contains the item.
+    """
+    tree = lxml_html.fromstring(page_source)
+    for script in tree.xpath("//script[@type='application/json' or @id='__NEXT_DATA__']"):
+        try:
+            item = _find_item(json.loads(script.text_content()))
+        except ValueError:
+            continue
+        if item is not None:
+            return dict(_payload_from_state(item), breadcrumbs=html_parser.parse_breadcrumbs(tree))
+
+    for script in tree.xpath("//script[@type='application/ld+json']"):
+        try:
+            data = json.loads(script.text_content())
+        except ValueError:
+            continue
+        for node in data if isinstance(data, list) else [data]:
+            if isinstance(node, dict) and node.get('@type') == 'Product':
+                return dict(_payload_from_json_ld(node), breadcrumbs=html_parser.parse_breadcrumbs(tree))
+    return None
+
+
+class HttpFetcher:
+    """Fetch item pages over a pooled HTTP/2 client instead of a browser.
+
+    ``fetch_product`` returns the same payload as the browser extraction
+    modes, or None when the served HTML doesn't contain the data, in which
+    case the caller should fall back to Selenium.
+    """
+
+    def __init__(self, timeout=15.0, max_connections=20, http2=True, headers=None, scheduler=None):
+        self.scheduler = scheduler or default_scheduler()
+        self.client = httpx.Client(
+            http2=http2,
+            headers=headers or DEFAULT_HEADERS,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+        )
+
+    def fetch(self, url):
+        """Return the page HTML, or None for a non-200 response"""
+        with self.scheduler.slot(url):
+            response = self.client.get(url)
+        self.scheduler.report(url, response.status_code, response.headers.get('Retry-After'))
+        if response.status_code != 200:
+            print(f"HTTP fetch of {url} returned {response.status_code}")
+            return None
+        return response.text
+
+    def fetch_listing(self, url):
+        """Fetch a catalog/search page and return its tiles, or None on failure"""
+        try:
+            page_source = self.fetch(url)
+            if page_source is None:
+                return None
+            return parse_listing(page_source, url)
+        except Exception as e:
+            print(f"HTTP listing fetch failed for {url}: {e}")
+            return None
+
+    def fetch_product(self, url):
+        """Fetch an item page and extract its payload without a browser"""
+        try:
+            page_source = self.fetch(url)
+            if page_source is None:
+                return None
+            payload = html_parser.parse_product_html(page_source, url)
+            if payload is None:
+                payload = parse_embedded_state(page_source)
+            return payload
+        except Exception as e:
+            print(f"HTTP fetch failed for {url}: {e}")
+            return None
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,79 @@
+import base64
+import json
+
+
+# True once every gallery image has finished loading (or failed)
+IMAGES_LOADED_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0])).every(img => img.complete);
+"""
+
+
+def enable_capture(options):
+    """Chrome options that record network events in the performance log"""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+
+class BrowserImageCapture:
+    """Read image bytes from Chrome's network layer instead of downloading them again.
+
+    Chrome must be started with ``enable_capture`` options. ``collect(urls)``
+    reads the performance log for image responses received since the last
+    call and fetches their bodies with ``Network.getResponseBody``. URLs the
+    browser did not load (lazy images, srcset variants, evicted buffers)
+    are left out, so the caller downloads those as before.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.captured = 0
+        self.missed = 0
+
+    def _image_responses(self):
+        """URL -> (requestId, mimeType) for image responses in the performance log"""
+        responses = {}
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            if message.get('method') != 'Network.responseReceived':
+                continue
+            params = message['params']
+            if params.get('type') != 'Image':
+                continue
+            response = params['response']
+            responses[response['url']] = (params['requestId'], response.get('mimeType'))
+        return responses
+
+    def discard(self):
+        """Drop log entries from earlier pages"""
+        try:
+            self.driver.get_log('performance')
+        except Exception as e:
+            print(f"Could not read performance log: {e}")
+
+    def collect(self, urls):
+        """Return {url: (bytes, content_type)} for the urls the browser loaded"""
+        try:
+            responses = self._image_responses()
+        except Exception as e:
+            print(f"Could not read performance log: {e}")
+            return {}
+
+        bodies = {}
+        for url in urls:
+            if url not in responses:
+                continue
+            request_id, mime_type = responses[url]
+            try:
+                body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            except Exception as e:
+                print(f"Could not capture image {url}: {e}")
+                continue
+            data = body['body']
+            data = base64.b64decode(data) if body.get('base64Encoded') else data.encode('latin-1')
+            bodies[url] = (data, mime_type or 'image/jpeg')
+        self.captured += len(bodies)
+        self.missed += len(urls) - len(bodies)
+        return bodies
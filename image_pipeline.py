@@ -0,0 +1,273 @@
+import hashlib
+import io
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from image_store import ImageIndex, blob_path_for, sniff_image_type, variant_path_for
+from scheduler import default_scheduler
+from metrics import default_metrics
+
+
+class ImagePipeline:
+    """Download product images and store them in GCS in the background.
+
+    All downloads share one keep-alive ``requests.Session``, are paced by the
+    CrawlScheduler, and the number of concurrent requests per host is capped
+    by a semaphore. Images are stored by content hash: a URL already in the
+    index is not downloaded again, and bytes already in the bucket are not
+    uploaded again. Each download is streamed in ``chunk_size`` pieces
+    through a spooled temp file (hashing as it goes) and then into a chunked
+    resumable upload. Bytes the browser already downloaded can be passed to
+    ``submit_bytes`` to skip the download. The content type and extension
+    come from the image bytes. With a ``transcoder`` (transcode.ImageTranscoder)
+    the original is stored with its metadata stripped, next to resized
+    variants named by variant_path_for. With ``perceptual_hashes`` every new
+    image's near_duplicates.perceptual_hash is kept in the index.
+    """
+
+    def __init__(self, storage, workers=8, per_host=4, timeout=(5, 30),
+                 max_retries=3, backoff=0.5, chunk_size=1024 * 1024, index=None, scheduler=None,
+                 metrics=None, transcoder=None, perceptual_hashes=False):
+        self.storage = storage
+        self.transcoder = transcoder
+        self.perceptual_hashes = perceptual_hashes
+        self.metrics = metrics or default_metrics()
+        self.scheduler = scheduler or default_scheduler()
+        self.index = index or ImageIndex(storage.db_name)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        # GCS requires resumable chunks to be a multiple of 256 KB
+        self.chunk_size = max(256 * 1024, chunk_size - chunk_size % (256 * 1024))
+        self.per_host = per_host
+        self.failed = []
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="images")
+        self._host_limits = {}
+        self._host_lock = threading.Lock()
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+
+    def _host_limit(self, url):
+        host = urlparse(url).netloc
+        with self._host_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def submit(self, url, content_type='image/jpeg'):
+        """Queue one image; returns a future that resolves to its blob path"""
+        future = self._executor.submit(self._store_with_retry, url, content_type)
+        with self._pending_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def submit_bytes(self, url, data, content_type='image/jpeg'):
+        """Queue image bytes captured elsewhere (e.g. by the browser); skips the download"""
+        future = self._executor.submit(self._store_with_retry, url, content_type, data)
+        with self._pending_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def when_done(self, futures, callback):
+        """Call ``callback(paths)`` once all futures finish; failed images are left out
+
+        ``wait`` also waits for the callback to return.
+        """
+        futures = list(futures)
+        remaining = [len(futures)]
+        lock = threading.Lock()
+        finished = Future()
+        with self._pending_lock:
+            self._pending.add(finished)
+        finished.add_done_callback(self._discard)
+
+        def _finish(paths):
+            try:
+                callback(paths)
+            except Exception as e:
+                print(f"Error finishing product after images: {e}")
+            finally:
+                finished.set_result(None)
+
+        def _one_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            _finish([f.result() for f in futures if f.exception() is None])
+
+        if not futures:
+            _finish([])
+        for future in futures:
+            future.add_done_callback(_one_done)
+
+    def _discard(self, future):
+        with self._pending_lock:
+            self._pending.discard(future)
+
+    def _store_with_retry(self, url, content_type, data=None):
+        known = self.index.lookup_url(url)
+        if known:
+            self.metrics.inc('images_known')
+            return known
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                if data is not None:
+                    return self._store_bytes(url, data, content_type)
+                with self._host_limit(url):
+                    return self._store(url, content_type)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"Error saving image {url}: {e}")
+                    self.failed.append((url, e))
+                    self.metrics.inc('errors', stage='image')
+                    raise
+                self.metrics.inc('retries', stage='image')
+                delay = self.backoff * 2 ** attempt
+                time.sleep(delay + random.uniform(0, delay / 2))
+
+    def _store(self, url, content_type):
+        """Download one image, hash it, and upload it unless already stored"""
+        digest = hashlib.sha256()
+        size = 0
+        head = b''
+        with tempfile.SpooledTemporaryFile(max_size=self.chunk_size) as spool:
+            with self.metrics.span('image_download'):
+                with self.scheduler.slot(url):
+                    response = self.session.get(url, stream=True, timeout=self.timeout)
+                with response:
+                    self.scheduler.report(url, response.status_code, response.headers.get('Retry-After'))
+                    response.raise_for_status()
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        if len(head) < 16:
+                            head += chunk[:16 - len(head)]
+                        digest.update(chunk)
+                        spool.write(chunk)
+                        size += len(chunk)
+            self.metrics.inc('image_bytes_downloaded', size)
+
+            sha = digest.hexdigest()
+            if self.transcoder is not None:
+                spool.seek(0)
+                return self._store_bytes(url, spool.read(), content_type, sha)
+            content_type, ext = sniff_image_type(head) or (content_type, '.jpg')
+            phash = self._phash(sha, spool)
+            blob_path = self._upload(spool, sha, size, content_type, ext)
+
+        self.index.record(url, sha, blob_path, size=size, content_type=content_type, phash=phash)
+        return blob_path
+
+    def _store_bytes(self, url, data, content_type, sha=None):
+        """Hash already downloaded bytes and upload them unless already stored"""
+        sha = sha or hashlib.sha256(data).hexdigest()
+        content_type, ext = sniff_image_type(data[:16]) or (content_type, '.jpg')
+        with io.BytesIO(data) as f:
+            phash = self._phash(sha, f)
+        if self.transcoder is not None and self.index.lookup_hash(sha) is None:
+            data, content_type, ext = self._transcode(sha, data, content_type, ext)
+        with io.BytesIO(data) as f:
+            blob_path = self._upload(f, sha, len(data), content_type, ext)
+        self.index.record(url, sha, blob_path, size=len(data), content_type=content_type, phash=phash)
+        return blob_path
+
+    def _phash(self, sha, f):
+        """Perceptual hash of a new image as stored in the index, or None"""
+        if not self.perceptual_hashes or self.index.lookup_hash(sha) is not None:
+            return None
+        from near_duplicates import perceptual_hash, to_signed
+
+        try:
+            f.seek(0)
+            with self.metrics.span('image_phash'):
+                return to_signed(perceptual_hash(f))
+        except Exception as e:
+            print(f"Could not hash image {sha}: {e}")
+            self.metrics.inc('errors', stage='phash')
+            return None
+
+    def _transcode(self, sha, data, content_type, ext):
+        """Upload the variants of an image; returns the stripped original
+
+        The blobs keep the name of the downloaded bytes' hash. Images that
+        can't be decoded are stored unchanged.
+        """
+        try:
+            with self.metrics.span('image_transcode'):
+                variants = self.transcoder.run(data)
+        except Exception as e:
+            print(f"Could not transcode image {sha}: {e}")
+            self.metrics.inc('errors', stage='transcode')
+            return data, content_type, ext
+        original, content_type, ext = variants.pop('original')
+        for name, (variant, variant_type, variant_ext) in variants.items():
+            with io.BytesIO(variant) as f:
+                self._put(variant_path_for(sha, name, variant_ext), f, len(variant), variant_type)
+        return original, content_type, ext
+
+    def _upload(self, f, sha, size, content_type, ext='.jpg'):
+        """Upload the content of f under its hash unless already stored; returns the blob path"""
+        blob_path = self.index.lookup_hash(sha)
+        if blob_path is not None:
+            self.metrics.inc('images_deduplicated')
+            return blob_path
+        blob_path = blob_path_for(sha, ext)
+        if not self._put(blob_path, f, size, content_type):
+            self.metrics.inc('images_deduplicated')
+        return blob_path
+
+    def _put(self, blob_path, f, size, content_type):
+        """Create a blob from f unless it already exists; returns whether it was created"""
+        from google.api_core.exceptions import PreconditionFailed
+
+        f.seek(0)
+        blob = self.storage.bucket.blob(blob_path)
+        blob.chunk_size = self.chunk_size
+        try:
+            # Only create the blob if nobody has stored these bytes yet
+            with self.metrics.span('image_upload'):
+                blob.upload_from_file(f, content_type=content_type, size=size,
+                                      if_generation_match=0, timeout=self.timeout[1])
+            self.metrics.inc('image_bytes_uploaded', size)
+            return True
+        except PreconditionFailed:
+            return False
+
+    def wait(self):
+        """Block until every submitted image has finished"""
+        while True:
+            with self._pending_lock:
+                pending = list(self._pending)
+            if not pending:
+                return
+            for future in pending:
+                try:
+                    future.result()
+                except Exception:
+                    pass
+
+    def close(self):
+        """Wait for in-flight images and release the connection pool"""
+        self.wait()
+        self._executor.shutdown(wait=True)
+        self.session.close()
+        self.index.close()
+        if self.transcoder is not None:
+            self.transcoder.close()
+        if self.failed:
+            print(f"{len(self.failed)} image(s) could not be saved")
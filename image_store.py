@@ -0,0 +1,122 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+
+def blob_path_for(digest, extension='.jpg'):
+    """Content-addressed blob name for an image with the given SHA-256"""
+    return f"images/{digest[:2]}/{digest}{extension}"
+
+
+def variant_path_for(digest, name, extension='.webp'):
+    """Blob name of a resized variant (e.g. 'thumb') of an image"""
+    return f"images/{digest[:2]}/{digest}_{name}{extension}"
+
+
+# Leading bytes -> (content type, extension)
+_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png', '.png'),
+    (b'GIF87a', 'image/gif', '.gif'),
+    (b'GIF89a', 'image/gif', '.gif'),
+)
+
+
+def sniff_image_type(head):
+    """(content type, extension) from an image's first 16 bytes, or None"""
+    for signature, content_type, extension in _SIGNATURES:
+        if head.startswith(signature):
+            return content_type, extension
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp', '.webp'
+    if head[4:12] in (b'ftypavif', b'ftypavis'):
+        return 'image/avif', '.avif'
+    return None
+
+
+class ImageIndex:
+    """Local SQLite index mapping source URL -> content hash -> blob path.
+
+    Lets the image pipeline skip the download for URLs it has already stored
+    and skip the upload for bytes that are already in the bucket.
+    """
+
+    def __init__(self, db_name="vinted_data.db"):
+        self.db_name = db_name
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.setup_database()
+
+    def setup_database(self):
+        with self._lock:
+            c = self.conn.cursor()
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS image_blobs (
+                    sha256 TEXT PRIMARY KEY,
+                    blob_path TEXT NOT NULL,
+                    size INTEGER,
+                    content_type TEXT,
+                    stored_at DATETIME,
+                    phash INTEGER
+                )
+            ''')
+            columns = [row[1] for row in c.execute('PRAGMA table_info(image_blobs)')]
+            if 'phash' not in columns:
+                c.execute('ALTER TABLE image_blobs ADD COLUMN phash INTEGER')
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS image_urls (
+                    url TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL REFERENCES image_blobs(sha256),
+                    seen_at DATETIME
+                )
+            ''')
+            self.conn.commit()
+
+    def lookup_url(self, url):
+        """Return the blob path for an already stored URL, or None"""
+        with self._lock:
+            row = self.conn.execute('''
+                SELECT b.blob_path FROM image_urls u
+                JOIN image_blobs b ON b.sha256 = u.sha256
+                WHERE u.url = ?
+            ''', (url,)).fetchone()
+        return row[0] if row else None
+
+    def lookup_hash(self, digest):
+        """Return the blob path for already stored content, or None"""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT blob_path FROM image_blobs WHERE sha256 = ?', (digest,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def lookup_phashes(self, urls):
+        """Perceptual hashes (signed 64-bit) of stored URLs that have one"""
+        urls = list(urls)
+        if not urls:
+            return []
+        with self._lock:
+            rows = self.conn.execute(f'''
+                SELECT b.phash FROM image_urls u
+                JOIN image_blobs b ON b.sha256 = u.sha256
+                WHERE u.url IN ({','.join('?' * len(urls))}) AND b.phash IS NOT NULL
+            ''', urls).fetchall()
+        return [row[0] for row in rows]
+
+    def record(self, url, digest, blob_path, size=None, content_type=None, phash=None):
+        """Remember that ``url`` has content ``digest`` stored at ``blob_path``"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self.conn.execute('''
+                INSERT OR IGNORE INTO image_blobs (sha256, blob_path, size, content_type, stored_at, phash)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (digest, blob_path, size, content_type, now, phash))
+            self.conn.execute('''
+                INSERT OR REPLACE INTO image_urls (url, sha256, seen_at)
+                VALUES (?, ?, ?)
+            ''', (url, digest, now))
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,97 @@
+from collections import defaultdict
+
+
+# URL patterns (Network.setBlockedURLs wildcards) for each resource group
+RESOURCE_PATTERNS = {
+    'images': ['*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.avif*', '*.svg*'],
+    'media': ['*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*'],
+    'fonts': ['*.woff*', '*.ttf*', '*.otf*', '*.eot*'],
+    'trackers': [
+        '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*',
+        '*googlesyndication.com*', '*googleadservices.com*', '*facebook.net*',
+        '*connect.facebook.com*', '*hotjar.com*', '*criteo.com*', '*criteo.net*',
+        '*scorecardresearch.com*', '*adnxs.com*', '*amazon-adsystem.com*',
+        '*taboola.com*', '*bat.bing.com*', '*analytics.tiktok.com*', '*sc-static.net*',
+    ],
+}
+
+# Resource groups blocked on each page type. Extraction only needs the DOM:
+# blocked images keep their src attributes. The cookie banner (OneTrust) is
+# left alone because handle_popups clicks it.
+PAGE_PROFILES = {
+    'home': ('images', 'media', 'fonts', 'trackers'),
+    'catalog': ('images', 'media', 'fonts', 'trackers'),
+    'search': ('images', 'media', 'fonts', 'trackers'),
+    'product': ('images', 'media', 'fonts', 'trackers'),
+}
+
+# Bytes transferred by the current document and its subresources. Cross-origin
+# responses without Timing-Allow-Origin report 0, so this is a lower bound.
+PAGE_WEIGHT_SCRIPT = """
+return performance.getEntriesByType('navigation')
+    .concat(performance.getEntriesByType('resource'))
+    .reduce((total, entry) => total + (entry.transferSize || 0), 0);
+"""
+
+
+def configure_options(options):
+    """Chrome options for bandwidth-light page loads"""
+    # driver.get returns at DOMContentLoaded; pages are waited for explicitly
+    options.page_load_strategy = 'eager'
+    options.add_argument('--disable-background-networking')
+    options.add_argument('--disable-component-update')
+    options.add_argument('--mute-audio')
+    return options
+
+
+class PageLoadProfile:
+    """Per page type network rules for one Chrome driver.
+
+    ``apply(page_type)`` blocks that page type's resource groups through
+    the DevTools protocol before the page is loaded; the rules are only
+    sent again when the page type changes. ``measure`` records the page
+    weight so ``summary()`` shows the bytes transferred per page type.
+    """
+
+    def __init__(self, driver, profiles=None):
+        self.driver = driver
+        self.profiles = dict(PAGE_PROFILES if profiles is None else profiles)
+        self.current = None
+        self.weights = defaultdict(list)
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            self.enabled = True
+        except Exception as e:
+            print(f"CDP network rules unavailable, loading pages unfiltered: {e}")
+            self.enabled = False
+
+    def blocked_urls(self, page_type):
+        """URL patterns blocked for a page type"""
+        patterns = []
+        for group in self.profiles.get(page_type, ()):
+            patterns.extend(RESOURCE_PATTERNS[group])
+        return patterns
+
+    def apply(self, page_type):
+        """Switch the network rules to the given page type's profile"""
+        if not self.enabled or page_type == self.current:
+            return
+        self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls(page_type)})
+        self.current = page_type
+
+    def measure(self, page_type):
+        """Record and return the bytes transferred by the current page"""
+        try:
+            size = self.driver.execute_script(PAGE_WEIGHT_SCRIPT)
+        except Exception as e:
+            print(f"Could not measure page weight: {e}")
+            return None
+        self.weights[page_type].append(size)
+        return size
+
+    def summary(self):
+        """Pages measured and mean KB transferred per page type"""
+        return {
+            page_type: {'pages': len(sizes), 'mean_kb': round(sum(sizes) / len(sizes) / 1024, 1)}
+            for page_type, sizes in self.weights.items() if sizes
+        }
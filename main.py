@@ -1,8 +1,3 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from google.cloud import storage
 import sqlite3
 import json
 from datetime import datetime
@@ -12,6 +7,8 @@ from urllib.parse import urlparse
 import os
 from storage import VintedStorage
 from scraper import Scraper
+from worker_pool import ScraperPool
+from metrics import default_metrics
 
 # Set Google credentials
 os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = r"C:\Users\joerling\Dropbox\0_Forschung\1_Paper\Vinted\scraping-450117-336603edb58d.json"
@@ -22,6 +19,7 @@ class VintedScraper:
         self.storage = VintedStorage(bucket_name)
         
         # Initialize Selenium
+        from selenium import webdriver
         options = webdriver.ChromeOptions()
         options.add_argument('--headless')  # Run in headless mode
         options.add_argument('--no-sandbox')
@@ -67,6 +65,7 @@ class VintedScraper:
 
     def _get_text(self, xpath, default=''):
         """Safely get text from an element"""
+        from selenium.webdriver.common.by import By
         try:
             element = self.driver.find_element(By.XPATH, xpath)
             return element.text.strip()
@@ -91,6 +90,7 @@ class VintedScraper:
 
     def _get_image_urls(self):
         """Get all product image URLs"""
+        from selenium.webdriver.common.by import By
         try:
             images = self.driver.find_elements(By.XPATH, '//img[contains(@class, "item-photo")]')
             return [img.get_attribute('src') for img in images if img.get_attribute('src')]
@@ -99,6 +99,7 @@ class VintedScraper:
 
     def scrape_search_results(self, search_url, max_items=100):
         """Scrape multiple products from search results"""
+        from selenium.webdriver.common.by import By
         try:
             self.driver.get(search_url)
             time.sleep(random.uniform(2, 4))
@@ -145,17 +146,32 @@ def main():
     # Initialize scraper with your GCS bucket name
     BUCKET_NAME = 'scrape_content'
     
-    # Initialize scraper with GCS bucket
-    scraper = Scraper(BUCKET_NAME)
+    # Number of parallel browsers; 1 keeps everything in a single browser
+    WORKERS = int(os.environ.get('VINTED_WORKERS', '1'))
+    
+    # Where to write run metrics: a .prom textfile for Prometheus, JSON otherwise
+    METRICS_PATH = os.environ.get('VINTED_METRICS', 'vinted_metrics.json')
+    
+    pool = None
+    if WORKERS > 1:
+        pool = ScraperPool(workers=WORKERS, bucket_name=BUCKET_NAME)
+        # Navigation browser shares the pool's storage; workers scrape the items
+        scraper = Scraper(BUCKET_NAME, storage=pool.storage, images=pool.images)
+    else:
+        # Initialize scraper with GCS bucket
+        scraper = Scraper(BUCKET_NAME)
     
     try:
         print("Starting scraper...")
-        scraper.scrape_women_all()  # Use this method instead of scrape_search_results
+        scraper.scrape_women_all(pool=pool)  # Use this method instead of scrape_search_results
         
     except Exception as e:
         print(f"Error in main: {e}")
     finally:
         scraper.close()
+        if pool is not None:
+            pool.close()
+        default_metrics().export(METRICS_PATH)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,232 @@
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+
+def _label_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed buckets"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def quantile(self, q):
+        """Approximate quantile: upper bound of the bucket it falls in"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, count in zip(self.buckets, self.counts):
+            if count >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """Thread-safe counters, latency histograms and timing spans for a run.
+
+    ``span(stage)`` times a block into the ``stage_seconds`` histogram, and
+    ``inc`` counts items, errors, bytes and retries. At the end of a run
+    ``summary()`` returns everything as a dict, ``write_json`` saves it and
+    ``write_prometheus`` writes a node_exporter textfile.
+    """
+
+    def __init__(self, prefix='vinted'):
+        self.prefix = prefix
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        """Add to a counter"""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Record one value (seconds) in a histogram"""
+        key = _key(name, labels)
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            self._histograms[key].observe(value)
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Time a block as one observation of ``stage_seconds{stage=...}``"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('stage_seconds', time.perf_counter() - start, stage=stage, **labels)
+
+    def summary(self):
+        """Counters and histogram statistics as a JSON-serialisable dict"""
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': h.count,
+                    'total': round(h.total, 3),
+                    'mean': round(h.total / h.count, 4) if h.count else None,
+                    'p50': h.quantile(0.5),
+                    'p95': h.quantile(0.95),
+                    'max': round(h.max, 3),
+                }
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+        return {
+            'started': self.started,
+            'elapsed': round(time.time() - self.started, 3),
+            'counters': counters,
+            'histograms': histograms,
+        }
+
+    def prometheus(self):
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(f"{self.prefix}_{name}_total{_label_text(labels)} {value}")
+            for (name, labels), h in sorted(self._histograms.items()):
+                metric = f"{self.prefix}_{name}"
+                for bound, count in zip(h.buckets, h.counts):
+                    lines.append(f"{metric}_bucket{_label_text(labels, [('le', bound)])} {count}")
+                lines.append(f"{metric}_bucket{_label_text(labels, [('le', '+Inf')])} {h.count}")
+                lines.append(f"{metric}_sum{_label_text(labels)} {h.total}")
+                lines.append(f"{metric}_count{_label_text(labels)} {h.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write a textfile for node_exporter's textfile collector (atomically)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, path)
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export(self, path):
+        """Write to path as a Prometheus textfile (.prom) or a JSON summary"""
+        if path.endswith('.prom'):
+            self.write_prometheus(path)
+        else:
+            self.write_json(path)
+        print(f"Wrote metrics to {path}")
+
+
+class Profiler:
+    """Profile a random sample of pages with cProfile or pyinstrument.
+
+    ``profile(label)`` wraps one unit of work; with probability
+    ``sample_rate`` it is profiled and the result saved to ``output_dir``
+    (``.prof`` for cProfile, ``.html`` for pyinstrument).
+    """
+
+    def __init__(self, sample_rate=0.0, output_dir="profiles", backend='cprofile'):
+        if backend not in ('cprofile', 'pyinstrument'):
+            raise ValueError(f"Unknown profiler backend: {backend}")
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.backend = backend
+        self.saved = 0
+        # Only one profiler can be active per process, so concurrent samples are skipped
+        self._active = threading.Lock()
+
+    @contextmanager
+    def profile(self, label):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate \
+                or not self._active.acquire(blocking=False):
+            yield
+            return
+        try:
+            with self._profile(label):
+                yield
+        finally:
+            self._active.release()
+
+    @contextmanager
+    def _profile(self, label):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{label}-{int(time.time() * 1000)}")
+        if self.backend == 'pyinstrument':
+            from pyinstrument import Profiler as Instrument
+            profiler = Instrument()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                with open(f"{path}.html", 'w') as f:
+                    f.write(profiler.output_html())
+        else:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                profiler.dump_stats(f"{path}.prof")
+        self.saved += 1
+
+
+_default = None
+_default_profiler = None
+_default_lock = threading.Lock()
+
+
+def default_metrics():
+    """Process-wide metrics shared by scrapers, storage and pipelines"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Metrics()
+        return _default
+
+
+def default_profiler():
+    """Process-wide profiler; VINTED_PROFILE_SAMPLE (0-1) and VINTED_PROFILER configure it"""
+    global _default_profiler
+    with _default_lock:
+        if _default_profiler is None:
+            _default_profiler = Profiler(
+                sample_rate=float(os.environ.get('VINTED_PROFILE_SAMPLE', '0')),
+                backend=os.environ.get('VINTED_PROFILER', 'cprofile'),
+            )
+        return _default_profiler
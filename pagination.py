@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ListingPrefetcher:
+    """Fetch upcoming catalog/search pages over HTTP while items are scraped.
+
+    ``page_url(page)`` builds the URL of a results page. ``prefetch(page)``
+    starts fetching that page and the ``depth - 1`` after it in the
+    background; ``get(page)`` returns its tiles, or None when the page
+    could not be read over HTTP (the caller then loads it in the browser).
+    """
+
+    def __init__(self, fetcher, page_url, depth=2):
+        self.fetcher = fetcher
+        self.page_url = page_url
+        self.depth = depth
+        self._executor = ThreadPoolExecutor(max_workers=max(1, depth), thread_name_prefix="prefetch")
+        self._futures = {}
+
+    def prefetch(self, page):
+        for upcoming in range(page, page + self.depth):
+            if upcoming not in self._futures:
+                self._futures[upcoming] = self._executor.submit(
+                    self.fetcher.fetch_listing, self.page_url(upcoming))
+
+    def get(self, page):
+        """Tiles of a page (waiting for its fetch), or None"""
+        future = self._futures.pop(page, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Prefetch of page {page} failed: {e}")
+            return None
+
+    def close(self):
+        for future in self._futures.values():
+            future.cancel()
+        self._executor.shutdown(wait=True)
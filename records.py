@@ -0,0 +1,160 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SELLER_FIELDS = ('seller_name', 'seller_image', 'seller_ratings', 'seller_rating',
+                 'upload_frequency', 'seller_location')
+
+_SCRAPE_TIME = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$')
+
+
+def dumps(record):
+    """Compact UTF-8 JSON bytes for a record (ProductRecord or dict)
+
+    Uses orjson when it is installed, the json module otherwise.
+    """
+    if hasattr(record, 'to_dict'):
+        record = record.to_dict()
+    if orjson is not None:
+        return orjson.dumps(record)
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data):
+    """Decode JSON bytes or text written by ``dumps``"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _check_text(name, value):
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"{name} must be a string, got {type(value).__name__}")
+    return value
+
+
+def _check_list(name, value):
+    if value is None:
+        return None
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"{name} must be a list, got {type(value).__name__}")
+    return list(value)
+
+
+class SellerInfo:
+    """Seller fields shown on an item page; all optional strings"""
+
+    __slots__ = SELLER_FIELDS
+
+    def __init__(self, **fields):
+        for name in SELLER_FIELDS:
+            setattr(self, name, _check_text(name, fields.pop(name, None)))
+        if fields:
+            raise ValueError(f"Unknown seller fields: {', '.join(fields)}")
+
+    @classmethod
+    def from_value(cls, value):
+        if value is None or isinstance(value, cls):
+            return value
+        if not isinstance(value, dict):
+            raise ValueError(f"seller_info must be a dict, got {type(value).__name__}")
+        return cls(**value)
+
+    def get(self, name, default=None):
+        value = getattr(self, name, None) if name in SELLER_FIELDS else None
+        return default if value is None else value
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in SELLER_FIELDS}
+
+
+class ProductRecord:
+    """One scraped product, with a fixed set of typed, slotted fields.
+
+    Detail labels outside the schema (e.g. 'color', 'uploaded') are kept in
+    ``extra``. Assigning through ``record[key] = value`` or ``update``
+    validates the value; unset fields are None and are left out of
+    ``to_dict``. Supports the read-only dict methods the storage and export
+    code use (``get``, ``[]``, ``in``), so records and plain dicts can be
+    passed to them interchangeably.
+    """
+
+    FIELDS = ('id', 'scrape_time', 'url', 'title', 'brand', 'size', 'condition', 'price',
+              'buyer_protection', 'description', 'breadcrumbs', 'category', 'image_urls',
+              'image_paths', 'image_count', 'seller_info', 'possible_duplicates')
+    LIST_FIELDS = ('image_urls', 'image_paths', 'possible_duplicates')
+
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, id, url, scrape_time, **fields):
+        if not id:
+            raise ValueError("id is required")
+        if not isinstance(scrape_time, str) or not _SCRAPE_TIME.match(scrape_time):
+            raise ValueError(f"scrape_time must look like 2025-02-08 14:30:00, got {scrape_time!r}")
+        self.id = _check_text('id', str(id))
+        self.url = _check_text('url', url)
+        self.scrape_time = scrape_time
+        for name in self.FIELDS[3:]:
+            setattr(self, name, None)
+        self.extra = {}
+        self.update(fields)
+
+    @classmethod
+    def from_dict(cls, data):
+        fields = dict(data)
+        return cls(fields.pop('id', None), fields.pop('url', None), fields.pop('scrape_time', None), **fields)
+
+    def __setitem__(self, key, value):
+        if key in ('id', 'url', 'scrape_time'):
+            raise KeyError(f"{key} is set when the record is created")
+        if key in self.LIST_FIELDS:
+            value = _check_list(key, value)
+        elif key == 'image_count':
+            if value is not None and not isinstance(value, int):
+                raise ValueError(f"image_count must be an int, got {type(value).__name__}")
+        elif key == 'seller_info':
+            value = SellerInfo.from_value(value)
+        elif key in self.FIELDS:
+            value = _check_text(key, value)
+        else:
+            self.extra[key] = value
+            return
+        setattr(self, key, value)
+
+    def update(self, fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+        else:
+            value = self.extra.get(key)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def to_dict(self):
+        data = {}
+        for name in self.FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value.to_dict() if name == 'seller_info' else value
+        data.update(self.extra)
+        return data
+
+    def summary(self):
+        """One line for logs"""
+        return (f"{self.id} | {self.title or '?'} | {self.brand or '?'} | {self.price or '?'} | "
+                f"{len(self.image_urls or ())} images")
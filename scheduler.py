@@ -0,0 +1,157 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Per-host token bucket; ``reserve`` returns how long to wait for a token"""
+
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # Take the token now even if it goes negative; later callers queue behind us
+        self.tokens -= 1
+        wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(wait, self.blocked_until - now)
+
+
+class CrawlScheduler:
+    """asyncio request scheduler shared by every part of the pipeline.
+
+    Each host gets a token bucket (``rate`` requests/second, ``burst`` deep,
+    overridable per host), every grant gets up to ``jitter`` seconds of random
+    delay, and at most ``concurrency`` requests are in flight at once. When a
+    host answers 429/503 its rate is halved (and Retry-After honoured); it
+    recovers gradually on successful responses.
+
+    The event loop runs in a background thread so that synchronous code
+    (Selenium, requests) can use ``slot``/``acquire``; async code can use
+    ``slot_async``/``acquire_async`` on the scheduler's loop directly.
+    """
+
+    def __init__(self, rate=1.0, burst=3, concurrency=16, jitter=0.5,
+                 host_rates=None, min_rate=0.05, recovery=0.1):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.host_rates = host_rates or {}
+        self.min_rate = min_rate
+        self.recovery = recovery
+        self._buckets = {}
+        self._loop = None
+        self._semaphore = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="crawl-scheduler", daemon=True)
+                thread.start()
+                self._semaphore = asyncio.run_coroutine_threadsafe(
+                    self._make_semaphore(), loop).result()
+                self._loop = loop
+        return self._loop
+
+    async def _make_semaphore(self):
+        return asyncio.Semaphore(self.concurrency)
+
+    def _bucket(self, host):
+        if host not in self._buckets:
+            rate = self.host_rates.get(host, self.rate)
+            self._buckets[host] = TokenBucket(rate, self.burst)
+        return self._buckets[host]
+
+    async def acquire_async(self, url):
+        """Wait until the host of ``url`` may be requested again"""
+        wait = self._bucket(urlparse(url).netloc).reserve()
+        await asyncio.sleep(wait + random.uniform(0, self.jitter))
+
+    async def _enter(self, url):
+        """Wait for the host's token, then take a concurrency slot
+
+        Waiting for the host happens outside the slot, so a backed-off host
+        doesn't hold slots that requests to other hosts could use.
+        """
+        bucket = self._bucket(urlparse(url).netloc)
+        await self.acquire_async(url)
+        while True:
+            await self._semaphore.acquire()
+            # The host may have been backed off while we queued for a slot
+            blocked = bucket.blocked_until - time.monotonic()
+            if blocked <= 0:
+                return
+            self._semaphore.release()
+            await asyncio.sleep(blocked)
+
+    @asynccontextmanager
+    async def slot_async(self, url):
+        """Rate-limited, concurrency-limited section for one request"""
+        await self._enter(url)
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+    def acquire(self, url):
+        """Blocking version of ``acquire_async`` for synchronous callers"""
+        loop = self._ensure_loop()
+        asyncio.run_coroutine_threadsafe(self.acquire_async(url), loop).result()
+
+    @contextmanager
+    def slot(self, url):
+        """Blocking version of ``slot_async`` for synchronous callers"""
+        loop = self._ensure_loop()
+        asyncio.run_coroutine_threadsafe(self._enter(url), loop).result()
+        try:
+            yield
+        finally:
+            loop.call_soon_threadsafe(self._semaphore.release)
+
+    def report(self, url, status, retry_after=None):
+        """Feed a response status back so the host's rate can adapt"""
+        loop = self._ensure_loop()
+        loop.call_soon_threadsafe(self._adapt, urlparse(url).netloc, status, retry_after)
+
+    def _adapt(self, host, status, retry_after):
+        bucket = self._bucket(host)
+        if status in (429, 503):
+            bucket.rate = max(self.min_rate, bucket.rate / 2)
+            try:
+                pause = float(retry_after) if retry_after else 1 / bucket.rate
+            except ValueError:
+                pause = 1 / bucket.rate
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + pause)
+            print(f"Slowing down {host} to {bucket.rate:.2f} req/s after {status}")
+        elif status is not None and status < 400 and bucket.rate < bucket.base_rate:
+            bucket.rate = min(bucket.base_rate, bucket.rate + bucket.base_rate * self.recovery)
+
+    def close(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler():
+    """Process-wide scheduler so all scrapers share the same host budgets"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = CrawlScheduler()
+        return _default
@@ -1,27 +1,121 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
-import time
-import random
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import partial
+from urllib.parse import urljoin
 import sys
 import os
-import pandas as pd
 import json
 from storage import VintedStorage
+import extraction
 import uuid  # Add this import for generating unique IDs
-import requests  # Added for image downloading
+from image_pipeline import ImagePipeline
+from waits import WaitStrategy
+from scheduler import default_scheduler
+from frontier import CrawlFrontier, DONE
+from load_profile import PAGE_PROFILES, PageLoadProfile, configure_options
+from image_capture import IMAGES_LOADED_SCRIPT, BrowserImageCapture, enable_capture
+from metrics import default_metrics, default_profiler
+from tiles import DetailCriteria, tile_record
+from session import WOMEN_CATALOG_ID, BrowserSession, catalog_url
+from pagination import ListingPrefetcher
+from catalog import record_item_id
+from records import ProductRecord
 
 # Add the project directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 class Scraper:
-    def __init__(self, bucket_name="scrape_content"):
-        """Initialize the scraper with Chrome driver and GCS storage"""
-        self.driver = webdriver.Chrome()
-        self.storage = VintedStorage(bucket_name)  # Initialize storage with your bucket
+    def __init__(self, bucket_name="scrape_content", extraction_mode="script", storage=None, images=None,
+                 fetch_mode="browser", scheduler=None, page_profiles=None,
+                 capture_images=False, home_url="https://www.vinted.com", detail_criteria=None,
+                 session_path="vinted_session.json", transcode_images=False, duplicates=None):
+        """Initialize the scraper with Chrome driver and GCS storage
+
+        extraction_mode is 'script' (whole product page in one execute_script
+        call), 'html' (parse driver.page_source offline with lxml) or 'dom'
+        (one WebDriver call per field). Pass storage/images to share them
+        between several scrapers; shared ones are not closed by close().
+        fetch_mode 'http' reads item pages over plain HTTP and only uses the
+        browser when the served HTML has no product data. All requests are
+        paced by the shared CrawlScheduler unless another one is passed in.
+        page_profiles maps page types to the resource groups Chrome blocks
+        while loading them (load_profile.PAGE_PROFILES by default, {} to
+        load everything). capture_images lets Chrome load item photos and
+        takes their bytes from the browser's network layer instead of
+        downloading them a second time. home_url is where navigation starts
+        (e.g. a local fixture site for benchmarks). Listing pages are
+        harvested tile by tile; detail_criteria (a tiles.DetailCriteria)
+        decides which already-known items still get a full page scrape.
+        Cookies and consent state are saved to session_path and restored
+        in new browsers so the popups are skipped (None disables this).
+        transcode_images strips photo metadata and stores thumbnail/WebP
+        variants (needs Pillow; ignored when images is passed in).
+        duplicates (a near_duplicates.NearDuplicateIndex) flags items whose
+        photos match another listing's; the image pipeline must then keep
+        perceptual hashes, as the one created here does.
+        """
+        if extraction_mode not in ('script', 'html', 'dom'):
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+        if fetch_mode not in ('browser', 'http'):
+            raise ValueError(f"Unknown fetch mode: {fetch_mode}")
+        self.extraction_mode = extraction_mode
+        self.home_url = home_url
+        self.detail_criteria = detail_criteria or DetailCriteria()
+        self.session = BrowserSession(session_path) if session_path else None
+        self._session_ready = False
+        self.metrics = default_metrics()
+        self.profiler = default_profiler()
+        if capture_images and page_profiles is None:
+            # Photos have to load in the browser to be captured
+            page_profiles = dict(PAGE_PROFILES, product=tuple(
+                group for group in PAGE_PROFILES['product'] if group != 'images'))
+        self.page_profiles = page_profiles
+        self.capture_images = capture_images
+        self.scheduler = scheduler or default_scheduler()
+        self.fetcher = None
+        if fetch_mode == 'http':
+            from http_fetcher import HttpFetcher
+            self.fetcher = HttpFetcher(scheduler=self.scheduler)
+        self.duplicates = duplicates
+        self.owns_storage = storage is None
+        self.storage = storage or VintedStorage(bucket_name)  # Initialize storage with your bucket
+        if images is None:
+            transcoder = None
+            if transcode_images:
+                from transcode import ImageTranscoder
+                transcoder = ImageTranscoder()
+            images = ImagePipeline(self.storage, scheduler=self.scheduler, transcoder=transcoder,
+                                   perceptual_hashes=duplicates is not None)
+        self.images = images
+        
+        # Chrome is launched on first use of self.driver
+        self._driver = None
+        self._waits = None
+        self._load_profile = None
+        self._capture = None
+
+    @property
+    def driver(self):
+        """Chrome driver, launched once on first use"""
+        if self._driver is None:
+            self._driver = self._launch_driver()
+        return self._driver
+
+    @property
+    def load_profile(self):
+        """Network rules for the current driver, set up on first use"""
+        if self._load_profile is None:
+            self._load_profile = PageLoadProfile(self.driver, self.page_profiles)
+        return self._load_profile
+
+    @property
+    def waits(self):
+        if self._waits is None:
+            self._waits = WaitStrategy(self.driver)
+        return self._waits
+
+    def _launch_driver(self):
+        """Start Chrome with the scraper's options"""
+        from selenium import webdriver
         
         # Initialize Selenium with additional options
         options = webdriver.ChromeOptions()
@@ -33,134 +127,288 @@ class Scraper:
         options.add_argument('--disable-software-rasterizer')
         options.add_argument('--disable-extensions')
         options.add_argument('--disable-logging')  # Reduce console logging
+        configure_options(options)
+        if self.capture_images:
+            enable_capture(options)
         
-        # Update this path to where your chromedriver is located
-        self.driver = webdriver.Chrome(options=options)  # Modern selenium doesn't need executable_path
-        self.driver.implicitly_wait(5)
+        driver = webdriver.Chrome(options=options)  # Modern selenium doesn't need executable_path
+        # No implicit wait: optional fields must not block, pages are waited for explicitly
+        driver.implicitly_wait(0)
+        if self.capture_images:
+            self._capture = BrowserImageCapture(driver)
+        return driver
+
+    def ready(self):
+        """Warm up: launch the browser if needed and check it and storage respond"""
+        try:
+            self.driver.execute_script('return document.readyState')
+            return self.storage.ready()
+        except Exception as e:
+            print(f"Scraper not ready: {e}")
+            return False
 
     def handle_popups(self):
         """Handle both country selection and cookie popups using recorded selectors"""
+        from selenium.webdriver.common.by import By
         try:
             print("Handling initial popups...")
             
             # Close country selection using recorded selector
             print("Attempting to close country selection popup...")
-            country_close = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((
-                    By.CSS_SELECTOR, 
-                    ".web_ui__Navigation__right > .web_ui__Button__button"
-                ))
-            )
+            country_close = self.waits.clickable((
+                By.CSS_SELECTOR, 
+                ".web_ui__Navigation__right > .web_ui__Button__button"
+            ), 'country_popup')
             country_close.click()
-            time.sleep(2)
+            self.waits.gone(country_close, 'country_popup_close')
             
             # Handle cookie popup using recorded ID
             print("Attempting to reject cookies...")
-            cookie_reject = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((
-                    By.ID, 
-                    "onetrust-reject-all-handler"
-                ))
-            )
+            cookie_reject = self.waits.clickable((By.ID, "onetrust-reject-all-handler"), 'cookie_popup')
             cookie_reject.click()
             print("Rejected cookies")
-            time.sleep(2)
+            self.waits.gone(cookie_reject, 'cookie_popup_close')
             
         except Exception as e:
             print(f"Error handling popups: {str(e)}")
 
-    def scrape_search_results(self, search_term, max_items=100):
-        """Scrape multiple products from search results"""
+    def _ensure_session(self):
+        """Get past the country and cookie popups once per browser
+
+        Restores the saved session when there is one, so neither the home
+        page nor the popups are needed. Otherwise opens the home page,
+        handles the popups and saves the session for later runs and other
+        workers.
+        """
+        if self._session_ready:
+            return
+        if self.session is not None:
+            self._navigate(urljoin(self.home_url, '/robots.txt'), 'home')
+            if self.session.restore(self.driver):
+                print("Restored saved browser session")
+                self._session_ready = True
+                return
+        self._navigate(self.home_url, 'home')
+        self.waits.page_ready('home')
+        self.handle_popups()
+        if self.session is not None:
+            self.session.save(self.driver)
+        self._session_ready = True
+
+    def _check_popups(self):
+        """Handle the popups if a restored session no longer suppresses them"""
+        from selenium.webdriver.common.by import By
+        if self.waits.optional(By.ID, "onetrust-reject-all-handler") is None:
+            return
+        print("Saved session has expired, handling popups again")
+        self.handle_popups()
+        if self.session is not None:
+            self.session.save(self.driver)
+
+    def open_catalog(self, search_text=None, catalog_id=None, brand_ids=(), page=1):
+        """Go straight to a catalog or search results page via its URL"""
+        self._ensure_session()
+        page_type = 'search' if search_text else 'catalog'
+        url = catalog_url(self.home_url, catalog_id=catalog_id, search_text=search_text,
+                          brand_ids=brand_ids, page=page)
+        print(f"Opening {url}")
+        self._navigate(url, page_type)
+        ready = self.waits.page_ready(page_type)
+        self._check_popups()
+        return ready
+
+    def scrape_search_results(self, search_term, max_items=100, pool=None, resume=True,
+                              prefetch_depth=2, max_pages=500):
+        """Scrape multiple products from search results
+
+        Results pages are visited by URL (page=N). The next prefetch_depth
+        pages are fetched over HTTP in the background while the current
+        page's items are scraped; pages that can't be read that way are
+        loaded in the browser. The crawl ends at the first page without
+        results (or one repeating the previous page).
+
+        If a ScraperPool is given, product URLs are handed to its workers
+        instead of being scraped in this browser. Progress (discovered URLs,
+        their state and the current results page) is checkpointed in a
+        CrawlFrontier, so a crashed or killed run continues where it stopped;
+        a run that ended at max_items, max_pages or the last page is finished,
+        and the next one starts over. Pass resume=False to start over anyway.
+        """
+        frontier = CrawlFrontier(f"search:{search_term}", self.storage.db_name)
+        prefetcher = None
         try:
-            # First go to main page
-            print("Navigating to main page...")
-            self.driver.get("https://www.vinted.com")
-            time.sleep(3)
+            cursor = frontier.load_cursor()
+            if not resume or (cursor and cursor.get('finished')):
+                frontier.reset()
+                cursor = None
+            frontier.recover()
             
-            # Handle popups using recorded selectors
-            self.handle_popups()
+            if cursor:
+                print(f"Resuming search '{search_term}' at page {cursor['page']}")
+            else:
+                cursor = {'page': 1, 'discovered': False}
+                frontier.save_cursor(cursor)
             
-            # Navigate to Women's section (as per recording)
-            women_link = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.LINK_TEXT, "Women"))
-            )
-            women_link.click()
-            time.sleep(2)
+            def page_url(page):
+                return catalog_url(self.home_url, search_text=search_term, page=page)
             
-            # Click "All" in Women's section
-            all_items = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((
-                    By.CSS_SELECTOR, 
-                    ".web_ui__Cell__default:nth-child(1) .web_ui__Cell__body > .web_ui__Text__body"
-                ))
-            )
-            all_items.click()
-            time.sleep(2)
+            if prefetch_depth:
+                fetcher = self.fetcher
+                if fetcher is None:
+                    from http_fetcher import HttpFetcher
+                    fetcher = HttpFetcher(scheduler=self.scheduler)
+                prefetcher = ListingPrefetcher(fetcher, page_url, depth=prefetch_depth)
             
-            # Now look for search field
-            print(f"Looking for search field...")
-            try:
-                search_input = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='search']"))
-                )
-                
-                print(f"Found search field, entering search term: {search_term}")
-                search_input.click()
-                time.sleep(1)
-                search_input.send_keys(search_term)
-                time.sleep(1)
-                search_input.send_keys(Keys.RETURN)
-                
-                print("Search submitted, waiting for results...")
-                time.sleep(3)
-                
-            except Exception as e:
-                print(f"Error with search: {str(e)}")
-                raise
+            # A URL is only done once its record is stored; until then it stays
+            # in progress, so recover() queues it again after a crash
+            def _on_done(product_url, ok):
+                if ok:
+                    frontier.complete(product_url)
+                else:
+                    frontier.fail(product_url)
             
-            products_scraped = 0
+            products_scraped = frontier.counts().get(DONE, 0)
+            previous_urls = None
             while products_scraped < max_items:
-                # Find all product links on current page
-                product_links = self.driver.find_elements(
-                    By.XPATH, 
-                    '//a[contains(@class, "item-link")]'
-                )
-                
-                # Scrape each product
-                for link in product_links:
-                    if products_scraped >= max_items:
+                if not cursor['discovered']:
+                    page = cursor['page']
+                    if prefetcher is not None:
+                        prefetcher.prefetch(page)
+                    with self.metrics.span('discover_page'):
+                        tiles = prefetcher.get(page) if prefetcher is not None else None
+                        if not tiles:
+                            # Not readable over HTTP: load the page in the browser
+                            self._ensure_session()
+                            self._navigate(page_url(page), 'search')
+                            self.waits.page_ready('search')
+                            if page == 1:
+                                self._check_popups()
+                            tiles = self._read_tiles(extraction.SEARCH_TILE_SELECTOR)
+                    if prefetcher is not None:
+                        prefetcher.prefetch(page + 1)
+                    
+                    page_urls = {tile['url'] for tile in tiles if tile.get('url')}
+                    if not page_urls or page_urls == previous_urls:
+                        print(f"No more results after page {page - 1}")
+                        cursor['finished'] = True
+                        frontier.save_cursor(cursor)
                         break
+                    previous_urls = page_urls
                     
-                    product_url = link.get_attribute('href')
-                    self.scrape_product(product_url)
+                    # Store every tile on the page; only new products (and known ones
+                    # matching the detail criteria) go on the frontier
+                    _, detail_urls = self._store_tiles(tiles)
+                    frontier.add(detail_urls)
+                    cursor['discovered'] = True
+                    frontier.save_cursor(cursor)
+                
+                # Scrape pending products, including any left over from an earlier run
+                for product_url in frontier.claim(max_items - products_scraped):
                     products_scraped += 1
-                    
-                    # Random delay between products
-                    time.sleep(random.uniform(1, 3))
-
-                # Try to click next page
-                try:
-                    next_button = self.driver.find_element(
-                        By.XPATH, 
-                        '//a[contains(@class, "pagination-next")]'
-                    )
-                    next_button.click()
-                    time.sleep(random.uniform(2, 4))
-                except:
-                    break  # No more pages
+                    if pool is not None:
+                        pool.submit(product_url, on_done=_on_done)
+                        continue
+                    # Pacing between products is handled by the scheduler
+                    if self.scrape_product(product_url, on_stored=partial(_on_done, product_url, True)) is None:
+                        _on_done(product_url, False)
+                
+                # A run that reaches its own limit is finished, not interrupted,
+                # so the next run starts a fresh search instead of resuming
+                if products_scraped >= max_items or cursor['page'] >= max_pages:
+                    if products_scraped < max_items:
+                        print(f"Stopping at the page limit ({max_pages})")
+                    cursor['finished'] = True
+                    frontier.save_cursor(cursor)
+                    break
+                
+                cursor = {'page': cursor['page'] + 1, 'discovered': False}
+                frontier.save_cursor(cursor)
+            
+            if pool is not None:
+                pool.join()
         except Exception as e:
             print(f"Error scraping search results: {e}")
+        finally:
+            try:
+                self._flush_stored(pool)
+                print(f"Search '{search_term}' progress: {frontier.counts()}")
+            except Exception as e:
+                print(f"Error flushing stored products: {e}")
+            if prefetcher is not None:
+                prefetcher.close()
+                if prefetcher.fetcher is not self.fetcher:
+                    prefetcher.fetcher.close()
+            frontier.close()
+
+    def _flush_stored(self, pool=None):
+        """Wait for queued images and write out buffered records
+
+        Completion callbacks of the products scraped so far run before this
+        returns.
+        """
+        if pool is not None:
+            pool.flush()
+        else:
+            self.images.wait()
+            self.storage.flush()
+
+    def _harvest_tiles(self, selector=extraction.TILE_SELECTOR):
+        """Store every tile on the listing page in the browser
+
+        Returns the tile records and the URLs that need a full detail-page
+        scrape (see _store_tiles).
+        """
+        return self._store_tiles(self._read_tiles(selector))
+
+    def _read_tiles(self, selector=extraction.TILE_SELECTOR):
+        """Read every tile on the listing page in one round trip"""
+        with self.metrics.span('harvest_tiles'):
+            return self.driver.execute_script(
+                extraction.TILE_SCRIPT,
+                selector,
+                extraction.TILE_BOX_SELECTOR,
+                extraction.TILE_FIELDS,
+            ) or []
+
+    def _store_tiles(self, tiles):
+        """Store tiles as listing records
+
+        Returns the records and the URLs that need a full detail-page
+        scrape: new items, plus known ones matching the detail criteria.
+        Known items are queued for revisit either way.
+        """
+        scrape_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        records = []
+        urls = set()
+        for tile in tiles:
+            if tile.get('url') and tile['url'] not in urls:
+                urls.add(tile['url'])
+                records.append(tile_record(tile, scrape_time))
+        previous_prices = self.storage.append_tiles(records)
+        self.metrics.inc('tiles_harvested', len(records))
+
+        detail_urls = []
+        for record in records:
+            is_new = self.storage.seen.should_scrape(record['url'])
+            previous_price = previous_prices.get(int(record['id'])) if record['id'] else None
+            if is_new or self.detail_criteria.matches(record, previous_price):
+                detail_urls.append(record['url'])
+        return records, detail_urls
 
     def _get_text(self, xpath, default=''):
-        """Safely get text from an element"""
+        """Safely get text from an element without waiting for it"""
+        from selenium.webdriver.common.by import By
         try:
-            element = self.driver.find_element(By.XPATH, xpath)
+            element = self.waits.optional(By.XPATH, xpath)
+            if element is None:
+                return default
             return element.text.strip()
         except:
             return default
 
     def _get_likes(self):
         """Get number of likes"""
+        from selenium.webdriver.common.by import By
         try:
             likes_element = self.driver.find_element(By.CSS_SELECTOR, "[data-testid='item-likes']")
             likes_text = likes_element.text
@@ -171,6 +419,7 @@ class Scraper:
 
     def _get_views(self):
         """Get number of views"""
+        from selenium.webdriver.common.by import By
         try:
             views_element = self.driver.find_element(By.CSS_SELECTOR, "[data-testid='item-views']")
             views_text = views_element.text
@@ -181,6 +430,7 @@ class Scraper:
 
     def _get_product_details(self):
         """Get all product details from the details list"""
+        from selenium.webdriver.common.by import By
         details = {}
         try:
             # Find all detail items
@@ -202,6 +452,7 @@ class Scraper:
 
     def _extract_details_from_container(self, container):
         """Extract all details from a container element"""
+        from selenium.webdriver.common.by import By
         details = {}
         
         try:
@@ -262,111 +513,236 @@ class Scraper:
             
         return details
 
-    def _save_images(self, unique_id, image_urls):
-        """Save product images to GCS"""
+    def _save_images(self, image_urls, captured=None):
+        """Queue product images for content-addressed storage in GCS
+
+        Downloads run in the background image pipeline, so this returns as
+        soon as the images are queued. Images in ``captured`` (url -> bytes,
+        content type) are uploaded without downloading them again. Returns
+        one future per image that resolves to the shared blob path.
+        """
         try:
-            image_paths = []
+            futures = []
+            captured = captured or {}
             for idx, img_url in enumerate(image_urls, 1):
-                # Create image filename with product ID and sequence number
-                image_filename = f"scrape_images/{unique_id}_image_{idx}.jpg"
-                
-                # Download image and upload to GCS
-                blob = self.storage.bucket.blob(image_filename)
-                
-                # Use requests to download the image
-                response = requests.get(img_url)
-                if response.status_code == 200:
-                    # Upload image content directly to GCS
-                    blob.upload_from_string(
-                        response.content,
-                        content_type='image/jpeg'
-                    )
-                    image_paths.append(image_filename)
-                    print(f"Saved image {idx} to GCS: {image_filename}")
-                
-                # Add small delay between image downloads
-                time.sleep(random.uniform(0.5, 1))
+                if img_url in captured:
+                    data, content_type = captured[img_url]
+                    futures.append(self.images.submit_bytes(img_url, data, content_type))
+                    print(f"Queued captured image {idx} for GCS: {img_url}")
+                else:
+                    futures.append(self.images.submit(img_url))
+                    print(f"Queued image {idx} for GCS: {img_url}")
             
-            return image_paths
+            return futures
         except Exception as e:
             print(f"Error saving images: {e}")
             return []
 
-    def scrape_product(self, product_url):
-        """Scrape a single product page"""
+    def _store_product(self, product_data, image_futures, on_stored=None):
+        """Append the product record once its images have been stored"""
+        def _finish(image_paths):
+            product_data['image_paths'] = image_paths
+            product_data['image_count'] = len(image_paths)
+            if self.duplicates is not None:
+                # Flagging is optional; a failure here must not lose the record
+                try:
+                    self._flag_duplicates(product_data)
+                except Exception as e:
+                    print(f"Error checking {product_data.get('url')} for duplicates: {e}")
+                    self.metrics.inc('errors', stage='duplicates')
+            self.storage.append_product(product_data, on_stored=on_stored)
+
+        self.images.when_done(image_futures, _finish)
+
+    def _flag_duplicates(self, product_data):
+        """Note other listings whose photos are near-identical to this item's"""
+        item_id = record_item_id(product_data)
+        phashes = self.images.index.lookup_phashes(product_data.get('image_urls') or [])
+        if item_id is None or not phashes:
+            return
+        matches = self.duplicates.check(item_id, phashes)
+        if matches:
+            product_data['possible_duplicates'] = [
+                {'id': str(other_id), 'distance': distance} for other_id, distance in matches[:10]]
+            self.metrics.inc('duplicates_flagged')
+            print(f"Item {item_id} looks like a repost of {', '.join(str(m[0]) for m in matches[:3])}")
+
+    def _use_profile(self, page_type):
+        """Apply the page type's network rules before it starts loading"""
+        self.load_profile.apply(page_type)
+
+    def _capture_images(self, image_urls):
+        """Image bytes the browser loaded for the current page, by URL"""
+        try:
+            self.waits.until(
+                lambda d: d.execute_script(IMAGES_LOADED_SCRIPT, extraction.IMAGE_SELECTOR),
+                'images_loaded', timeout=5)
+        except Exception:
+            print("Not all images finished loading; downloading the rest")
+        return self._capture.collect(image_urls)
+
+    def _navigate(self, url, page_type=None):
+        """Load a page once the scheduler allows another request to its host"""
+        if page_type is not None:
+            self._use_profile(page_type)
+        with self.metrics.span('navigate', page=page_type or 'other'):
+            with self.scheduler.slot(url):
+                self.driver.get(url)
+
+    def _wait_for_product_page(self):
+        """Wait until the product details have been rendered"""
+        self.waits.page_ready('product')
+
+    def _extract_product(self):
+        """Extract the product payload from the page loaded in the browser"""
+        if self.extraction_mode == 'script':
+            return self._extract_product_script()
+        if self.extraction_mode == 'html':
+            return self._extract_product_html()
+        return self._extract_product_dom()
+
+    def _extract_product_script(self):
+        """Collect the product payload in a single execute_script round trip"""
+        payload = self.driver.execute_script(
+            extraction.PRODUCT_SCRIPT,
+            extraction.MAIN_INFO_CLASS,
+            extraction.IMAGE_SELECTOR,
+            extraction.DESCRIPTION_XPATH,
+            extraction.SELLER_XPATHS,
+            extraction.SELLER_ATTRIBUTES,
+            extraction.BREADCRUMB_SELECTOR,
+        )
+        if payload is None:
+            raise ValueError("Product main info not found on page")
+        return payload
+
+    def _extract_product_html(self):
+        """Fetch the page source once and parse it outside the browser"""
+        import html_parser
+        payload = html_parser.parse_product_html(self.driver.page_source, self.driver.current_url)
+        if payload is None:
+            raise ValueError("Product main info not found on page")
+        return payload
+
+    def _extract_product_dom(self):
+        """Collect the product payload with individual WebDriver lookups"""
+        from selenium.webdriver.common.by import By
+        main_container = self.driver.find_element(By.CLASS_NAME, extraction.MAIN_INFO_CLASS).find_element(By.XPATH, '..')
+        details = self._extract_details_from_container(main_container)
+
+        # Get all image URLs from the item-photos container
+        image_urls = []
+        try:
+            image_elements = self.driver.find_elements(By.CSS_SELECTOR, extraction.IMAGE_SELECTOR)
+            image_urls = [img.get_attribute('src') for img in image_elements if img.get_attribute('src')]
+        except Exception as e:
+            print(f"Error getting images: {e}")
+
+        # Get seller information
+        seller_data = {}
+        for key, xpath in extraction.SELLER_XPATHS.items():
+            if key in extraction.SELLER_ATTRIBUTES:
+                seller_data[key] = self.driver.find_element(By.XPATH, xpath).get_attribute(extraction.SELLER_ATTRIBUTES[key])
+            else:
+                seller_data[key] = self._get_text(xpath)
+
+        breadcrumbs = [element.text.strip() for element in
+                       self.driver.find_elements(By.CSS_SELECTOR, extraction.BREADCRUMB_SELECTOR)]
+
+        return {
+            'details': details,
+            'image_urls': image_urls,
+            'description': self._get_text(extraction.DESCRIPTION_XPATH),
+            'seller_info': seller_data,
+            'breadcrumbs': ' > '.join(crumb for crumb in breadcrumbs if crumb),
+        }
+
+    def scrape_product(self, product_url, on_stored=None, category=None):
+        """Scrape a single product page, timed (and sometimes profiled) as a whole
+
+        Returns the product record, or None if the page could not be loaded
+        or its product data could not be extracted. The record is stored in
+        the background; ``on_stored()`` is called once it is durably written
+        (see VintedStorage.append_product). ``category`` is the top-level
+        category of the listing the URL came from, if known; the export
+        partitions by it and otherwise by the page's breadcrumbs.
+        """
+        with self.profiler.profile('product'), self.metrics.span('product'):
+            product_data = self._scrape_product(product_url, on_stored, category)
+        self.metrics.inc('items_scraped' if product_data is not None else 'items_failed')
+        return product_data
+
+    def _scrape_product(self, product_url, on_stored=None, category=None):
         try:
             print("\n=== PRODUCT DATA ===")
             print(f"URL: {product_url}")
-            self.driver.get(product_url)
-            time.sleep(random.uniform(2, 4))
 
-            # Generate unique ID
-            unique_id = str(uuid.uuid4())
+            # Try the served HTML first in http mode, fall back to the browser
+            payload = None
+            if self.fetcher is not None:
+                with self.metrics.span('http_fetch'):
+                    payload = self.fetcher.fetch_product(product_url)
+                if payload is None:
+                    print("HTTP fetch had no product data, falling back to browser")
+            in_browser = payload is None
+            if in_browser:
+                # In http mode the browser is only started (and warmed up) here
+                self._ensure_session()
+                if self._capture is not None:
+                    self._capture.discard()
+                self._navigate(product_url, 'product')
+                self._wait_for_product_page()
+                self.load_profile.measure('product')
 
-            product_data = {
-                'id': unique_id,
-                'scrape_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'url': product_url
-            }
+            # Use Vinted's item ID; fall back to a random one for unusual URLs
+            item_id = extraction.item_id_from_url(product_url)
+            unique_id = str(item_id) if item_id else str(uuid.uuid4())
+
+            product_data = ProductRecord(
+                id=unique_id,
+                scrape_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                url=product_url,
+            )
 
             try:
-                main_container = self.driver.find_element(By.CLASS_NAME, "details-list--main-info").find_element(By.XPATH, '..')
-                details = self._extract_details_from_container(main_container)
-                product_data.update(details)
+                if payload is None:
+                    with self.metrics.span('extract', mode=self.extraction_mode):
+                        payload = self._extract_product()
+                product_data.update(payload['details'])
 
-                # Get all image URLs from the item-photos container
-                image_urls = []
-                try:
-                    image_elements = self.driver.find_elements(
-                        By.CSS_SELECTOR,
-                        ".item-photos img.web_ui__Image__content"
-                    )
-                    image_urls = [img.get_attribute('src') for img in image_elements if img.get_attribute('src')]
-                    
-                    # Save images to GCS and get their paths
-                    if image_urls:
-                        image_paths = self._save_images(unique_id, image_urls)
-                        product_data['image_paths'] = image_paths
-                        product_data['image_count'] = len(image_paths)
-                except Exception as e:
-                    print(f"Error getting images: {e}")
-                    product_data['image_paths'] = []
-                    product_data['image_count'] = 0
-
-                # Get description separately as it might be in a different location
-                description = self._get_text('/html/body/div[1]/div/main/div/div[1]/div/div[2]/div/div/main/div[1]/aside/div[2]/div[1]/div/div/div/div/div/div[2]/div[3]/div/div/div[1]/div/span/span')
-                if description:
-                    product_data['description'] = description
-
-                # Get seller information
-                seller_data = {
-                    'seller_name': self._get_text('//*[@id="sidebar"]/div[2]/div[3]/div/a/div[2]/div[1]/div/div/span'),
-                    'seller_image': self.driver.find_element(By.XPATH, '//*[@id="sidebar"]/div[2]/div[3]/div/a/div[2]/div[1]/div/div/span').get_attribute('src'),
-                    'seller_ratings': self._get_text('//*[@id="sidebar"]/div[2]/div[3]/div/a/div[2]/div[2]/div/div[6]/h4'),
-                    'seller_rating': self._get_text('//*[@id="sidebar"]/div[2]/div[3]/div/a/div[2]/div[2]/div'),
-                    'upload_frequency': self._get_text('//*[@id="sidebar"]/div[2]/div[3]/div/div[2]/div/div[2]/div[1]/div'),
-                    'seller_location': self._get_text('//*[@id="sidebar"]/div[2]/div[3]/div/div[4]/div/div/div[1]/div[2]')
-                }
-                product_data['seller_info'] = seller_data
-
-                # Save to GCS
-                filename = f'vinted_products_{datetime.now().strftime("%Y%m%d")}.json'
-                
-                # Get existing data from GCS
-                existing_data = self.storage.read_json(filename)
-                if not existing_data:
-                    existing_data = []
-                
-                # Append new data and save back to GCS
-                existing_data.append(product_data)
-                self.storage.write_json(filename, existing_data)
+                # Queue images for GCS; their paths are filled in when stored
+                image_urls = payload['image_urls']
+                image_futures = []
+                if image_urls:
+                    product_data['image_urls'] = image_urls
+                    captured = None
+                    if in_browser and self._capture is not None:
+                        with self.metrics.span('image_capture'):
+                            captured = self._capture_images(image_urls)
+                    image_futures = self._save_images(image_urls, captured)
+                    self.metrics.inc('images_queued', len(image_urls))
+
+                # Description is looked up separately as it might be in a different location
+                if payload['description']:
+                    product_data['description'] = payload['description']
+
+                product_data['seller_info'] = payload['seller_info']
+                if payload.get('breadcrumbs'):
+                    product_data['breadcrumbs'] = payload['breadcrumbs']
+                if category:
+                    product_data['category'] = category
+
+                # Append to today's JSONL shards in GCS
+                self._store_product(product_data, image_futures, on_stored)
                 
-                print(f"\nSaved data to GCS bucket: scrape_content/{filename}")
-                print("\nData collected:")
-                print(json.dumps(product_data, indent=2, ensure_ascii=False))
+                print("\nQueued product for GCS bucket: scrape_content/products/")
+                print(f"Data collected: {product_data.summary()}")
 
             except Exception as e:
+                # Nothing was stored; report the item as failed so it can be retried
                 print(f"Error getting specific details: {e}")
+                self.metrics.inc('errors', stage='extract')
+                return None
 
             print("\n=== END PRODUCT DATA ===")
             return product_data
@@ -377,6 +753,7 @@ class Scraper:
 
     def _get_shipping_cost(self):
         """Get shipping cost"""
+        from selenium.webdriver.common.by import By
         try:
             shipping_element = self.driver.find_element(By.CSS_SELECTOR, "[data-testid='shipping-price']")
             shipping_text = shipping_element.text
@@ -387,6 +764,7 @@ class Scraper:
 
     def _get_image_urls(self):
         """Get all product image URLs"""
+        from selenium.webdriver.common.by import By
         try:
             # Look for the image gallery
             images = self.driver.find_elements(By.CSS_SELECTOR, ".item-photos img")
@@ -396,89 +774,79 @@ class Scraper:
             return []
 
     def close(self):
-        """Close the browser"""
-        if self.driver:
-            self.driver.quit()
+        """Close the browser and flush pending storage writes"""
+        if self._waits is not None and self._waits.timings:
+            print(f"Wait times (s): {json.dumps(self._waits.summary())}")
+        if self._load_profile is not None and self._load_profile.weights:
+            print(f"Page weight: {json.dumps(self._load_profile.summary())}")
+        if self._capture is not None:
+            print(f"Images captured from browser: {self._capture.captured}, "
+                  f"downloaded instead: {self._capture.missed}")
+        try:
+            if self.fetcher is not None:
+                self.fetcher.close()
+            if self.owns_storage:
+                self.images.close()
+                self.storage.close()
+        finally:
+            if self._driver is not None:
+                self._driver.quit()
+                self._driver = None
+                self._session_ready = False
 
-    def scrape_women_all(self):
-        """Follow the exact navigation steps from Vinted.side and scrape results"""
+    def scrape_women_all(self, pool=None):
+        """Open the Women > All catalog and scrape its products"""
         try:
-            # Step 1: Open main page
-            print("Navigating to main page...")
-            self.driver.get("https://www.vinted.com")
-            time.sleep(3)
-            
-            # Step 2: Close country selection popup
-            print("Closing country selection...")
-            country_close = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((
-                    By.CSS_SELECTOR, 
-                    ".web_ui__Navigation__right > .web_ui__Button__button"
-                ))
-            )
-            country_close.click()
-            time.sleep(2)
-            
-            # Step 3: Handle cookie popup
-            print("Handling cookie popup...")
-            cookie_reject = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((
-                    By.ID, 
-                    "onetrust-reject-all-handler"
-                ))
-            )
-            cookie_reject.click()
-            time.sleep(2)
-            
-            # Step 4: Click Women link
-            print("Clicking Women category...")
-            women_link = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.LINK_TEXT, "Women"))
-            )
-            women_link.click()
-            time.sleep(2)
-            
-            # Step 5: Click All in Women's section
-            print("Clicking All items...")
-            all_items = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((
-                    By.CSS_SELECTOR, 
-                    ".web_ui__Cell__default:nth-child(1) .web_ui__Cell__body > .web_ui__Text__body"
-                ))
-            )
-            all_items.click()
-            time.sleep(2)
+            print("Opening Women > All catalog...")
+            self.open_catalog(catalog_id=WOMEN_CATALOG_ID)
             
             # Now scrape the products on the page
             print("Starting to scrape products...")
-            self.scrape_current_page_products()
+            self.scrape_current_page_products(pool=pool, category='Women')
             
         except Exception as e:
             print(f"Error during navigation: {str(e)}")
             raise
 
-    def scrape_current_page_products(self):
-        """Scrape all products visible on the current page"""
+    def scrape_current_page_products(self, pool=None, category=None):
+        """Harvest the product tiles on the current page and scrape new products
+
+        Without a pool only the first product is scraped in this browser;
+        with a ScraperPool every product on the page is handed to its workers.
+        ``category`` is recorded on the products (see scrape_product).
+        """
         try:
-            # Find all product links using the content section selector
-            product_links = self.driver.find_elements(
-                By.CSS_SELECTOR, 
-                "#content div.new-item-box__image-container > a"
-            )
+            # Harvest all tiles at once; only new items (and known ones matching
+            # the detail criteria) get a full scrape
+            tiles, new_urls = self._harvest_tiles()
+            print(f"Harvested {len(tiles)} product tiles, {len(new_urls)} need a full scrape")
             
-            if product_links:
-                # Just get the first product
-                first_product = product_links[0]
-                product_url = first_product.get_attribute('href')
+            if new_urls and pool is not None:
+                for product_url in new_urls:
+                    pool.submit(product_url, category=category)
+                print(f"Queued {len(new_urls)} products for the worker pool")
+            elif new_urls:
+                # Just get the first new product
+                product_url = new_urls[0]
                 print(f"Found first product URL: {product_url}")
-                self.scrape_product(product_url)
+                self.scrape_product(product_url, category=category)
                 print("Finished scraping first product")
             else:
-                print("No products found on page")
+                print("No new products found on page")
                     
         except Exception as e:
             print(f"Error scraping page: {str(e)}")
 
+    def scrape_revisits(self, limit=50, min_age=timedelta(hours=24), pool=None):
+        """Re-scrape known items that were listed again, stalest first"""
+        revisit_urls = self.storage.seen.next_revisits(limit=limit, min_age=min_age)
+        print(f"Revisiting {len(revisit_urls)} known products")
+        for product_url in revisit_urls:
+            if pool is not None:
+                pool.submit(product_url)
+            else:
+                self.scrape_product(product_url)
+
 # Remove or comment out these lines if they exist
 # scraper = Scraper(bucket_name='scrape_content')
 # try:
@@ -0,0 +1,157 @@
+import hashlib
+import math
+import mmap
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from extraction import item_id_from_url
+
+
+class BloomFilter:
+    """Compact on-disk Bloom filter over integer item IDs.
+
+    The bit array lives in a memory-mapped file, so it survives restarts
+    and only the pages that are touched get loaded. ``in`` can return false
+    positives (at roughly ``error_rate``) but never false negatives.
+    """
+
+    def __init__(self, path, capacity=10_000_000, error_rate=0.001):
+        bits = int(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.size = bits - bits % 8 + 8
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.path = path
+
+        self.created = not os.path.exists(path) or os.path.getsize(path) != self.size // 8
+        if self.created:
+            with open(path, 'wb') as f:
+                f.truncate(self.size // 8)
+        self._file = open(path, 'r+b')
+        self._bits = mmap.mmap(self._file.fileno(), self.size // 8)
+
+    def _positions(self, item_id):
+        digest = hashlib.blake2b(str(item_id).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item_id):
+        for pos in self._positions(item_id):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item_id):
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item_id))
+
+    def flush(self):
+        self._bits.flush()
+
+    def close(self):
+        self._bits.flush()
+        self._bits.close()
+        self._file.close()
+
+
+class SeenIndex:
+    """Which items have been scraped, and which known items to revisit.
+
+    New items (not in the Bloom pre-filter, or not in the table) get a full
+    scrape. Known items found again in a listing are put on a revisit queue
+    that is served stalest-first, so repeat runs only pay for what changed.
+    """
+
+    def __init__(self, db_name="vinted_data.db", bloom_path="seen_items.bloom",
+                 capacity=10_000_000, error_rate=0.001):
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.setup_database()
+        self.bloom = BloomFilter(bloom_path, capacity, error_rate)
+        if self.bloom.created:
+            self._rebuild_bloom()
+
+    def setup_database(self):
+        with self._lock:
+            c = self.conn.cursor()
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS seen_items (
+                    item_id INTEGER PRIMARY KEY,
+                    url TEXT,
+                    first_scraped DATETIME,
+                    last_scraped DATETIME,
+                    scrape_count INTEGER DEFAULT 0,
+                    last_listed DATETIME,
+                    revisit_pending INTEGER DEFAULT 0
+                )
+            ''')
+            c.execute('''
+                CREATE INDEX IF NOT EXISTS idx_seen_revisit
+                ON seen_items(revisit_pending, last_scraped)
+            ''')
+            self.conn.commit()
+
+    def _rebuild_bloom(self):
+        with self._lock:
+            for (item_id,) in self.conn.execute('SELECT item_id FROM seen_items'):
+                self.bloom.add(item_id)
+        self.bloom.flush()
+
+    def is_known(self, item_id):
+        """Whether the item has been scraped before"""
+        if item_id not in self.bloom:
+            return False
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT 1 FROM seen_items WHERE item_id = ?', (item_id,)
+            ).fetchone()
+        return row is not None
+
+    def should_scrape(self, url):
+        """True for new items; known items are queued for revisit instead"""
+        item_id = item_id_from_url(url)
+        if item_id is None:
+            return True
+        if not self.is_known(item_id):
+            return True
+        with self._lock:
+            self.conn.execute('''
+                UPDATE seen_items SET last_listed = ?, revisit_pending = 1, url = ?
+                WHERE item_id = ?
+            ''', (datetime.now().isoformat(), url, item_id))
+            self.conn.commit()
+        return False
+
+    def mark_scraped(self, url, scraped_at=None):
+        """Record a full scrape of an item"""
+        item_id = item_id_from_url(url)
+        if item_id is None:
+            return
+        scraped_at = scraped_at or datetime.now().isoformat()
+        with self._lock:
+            self.conn.execute('''
+                INSERT INTO seen_items (item_id, url, first_scraped, last_scraped, scrape_count)
+                VALUES (?, ?, ?, ?, 1)
+                ON CONFLICT(item_id) DO UPDATE SET
+                    url = excluded.url,
+                    last_scraped = excluded.last_scraped,
+                    scrape_count = scrape_count + 1,
+                    revisit_pending = 0
+            ''', (item_id, url, scraped_at, scraped_at))
+            self.conn.commit()
+            self.bloom.add(item_id)
+
+    def next_revisits(self, limit=50, min_age=timedelta(hours=24)):
+        """URLs of queued known items, stalest first, last scraped before min_age ago"""
+        cutoff = (datetime.now() - min_age).isoformat()
+        with self._lock:
+            rows = self.conn.execute('''
+                SELECT url FROM seen_items
+                WHERE revisit_pending = 1 AND last_scraped < ?
+                ORDER BY last_scraped ASC
+                LIMIT ?
+            ''', (cutoff, limit)).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        self.bloom.close()
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode, urljoin
+
+# Vinted catalog ID of the Women > All category
+WOMEN_CATALOG_ID = 1904
+
+
+def catalog_url(base_url, catalog_id=None, search_text=None, brand_ids=(), page=None, order=None):
+    """Deep link to a catalog or search results page
+
+    e.g. catalog_url(base, search_text='nike', brand_ids=[53], page=2) ->
+    https://www.vinted.com/catalog?search_text=nike&brand_ids[]=53&page=2
+    """
+    params = []
+    if search_text:
+        params.append(('search_text', search_text))
+    if catalog_id is not None:
+        params.append(('catalog[]', catalog_id))
+    params.extend(('brand_ids[]', brand_id) for brand_id in brand_ids)
+    if order:
+        params.append(('order', order))
+    if page and page > 1:
+        params.append(('page', page))
+    url = urljoin(base_url.rstrip('/') + '/', 'catalog')
+    return f"{url}?{urlencode(params, safe='[]')}" if params else url
+
+
+STORAGE_SCRIPT = "return Object.assign({}, window.localStorage);"
+
+RESTORE_STORAGE_SCRIPT = """
+for (const [key, value] of Object.entries(arguments[0])) {
+    window.localStorage.setItem(key, value);
+}
+"""
+
+
+class BrowserSession:
+    """Cookies and consent state saved to disk and shared between runs and workers.
+
+    ``save`` stores the driver's cookies and localStorage (where the cookie
+    consent and country choice live) in a JSON file; ``restore`` puts them
+    back into a fresh browser, so the popups don't appear again. A session
+    older than ``max_age`` seconds is treated as cold.
+    """
+
+    def __init__(self, path="vinted_session.json", max_age=7 * 24 * 3600):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Saved session state, or None if there is none or it is too old"""
+        with self._lock:
+            if not os.path.exists(self.path):
+                return None
+            try:
+                with open(self.path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable session file {self.path}: {e}")
+                return None
+        if time.time() - state.get('saved_at', 0) > self.max_age:
+            return None
+        return state
+
+    def save(self, driver):
+        """Save the current page's cookies and localStorage"""
+        state = {
+            'saved_at': time.time(),
+            'cookies': driver.get_cookies(),
+            'local_storage': driver.execute_script(STORAGE_SCRIPT) or {},
+        }
+        with self._lock:
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+
+    def restore(self, driver):
+        """Load a saved session into the browser; returns False if there is none
+
+        Cookies can only be set for the current document's domain, so the
+        browser must already be on a page of the site.
+        """
+        state = self.load()
+        if not state or not state.get('cookies'):
+            return False
+        now = time.time()
+        for cookie in state['cookies']:
+            if cookie.get('expiry') and cookie['expiry'] < now:
+                continue
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                print(f"Could not restore cookie {cookie.get('name')}: {e}")
+        if state.get('local_storage'):
+            driver.execute_script(RESTORE_STORAGE_SCRIPT, state['local_storage'])
+        return True
+
+    def clear(self):
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
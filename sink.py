@@ -0,0 +1,159 @@
+import gzip
+import io
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from records import dumps, loads
+
+
+class JsonlShardSink:
+    """Append-only JSONL sink that writes records into rotated shards in GCS.
+
+    Records are written one object per line into a local spool file. When the
+    shard reaches ``max_records``, ``max_bytes`` or ``max_age`` seconds (or the
+    day changes) it is uploaded once as its own blob and added to the day's
+    manifest. Uploads go through ``storage.submit`` so they run off the
+    scraping thread. Every writer uses its own shard names, so several workers can
+    write to the same prefix without overwriting each other.
+    """
+
+    EXTENSIONS = {None: '.jsonl', 'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+
+    def __init__(self, storage, prefix="products", max_records=5000,
+                 max_bytes=64 * 1024 * 1024, max_age=600, compression='gzip'):
+        if compression not in self.EXTENSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.storage = storage
+        self.prefix = prefix.rstrip('/')
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compression = compression
+        self.writer_id = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._shard = None
+
+    def _open_shard(self):
+        """Start a new local shard for today's partition"""
+        day = datetime.now().strftime('%Y%m%d')
+        self._sequence += 1
+        name = (f"{self.prefix}/dt={day}/"
+                f"part-{self.writer_id}-{self._sequence:05d}{self.EXTENSIONS[self.compression]}")
+
+        spool = tempfile.TemporaryFile()
+        if self.compression == 'gzip':
+            stream = gzip.GzipFile(fileobj=spool, mode='wb')
+        elif self.compression == 'zstd':
+            import zstandard
+            stream = zstandard.ZstdCompressor().stream_writer(spool, closefd=False)
+        else:
+            stream = spool
+
+        self._shard = {
+            'name': name,
+            'day': day,
+            'spool': spool,
+            'stream': stream,
+            'records': 0,
+            'bytes': 0,
+            'opened_at': time.monotonic(),
+            'callbacks': [],
+        }
+
+    def _should_rotate(self):
+        shard = self._shard
+        return (shard['records'] >= self.max_records
+                or shard['bytes'] >= self.max_bytes
+                or time.monotonic() - shard['opened_at'] >= self.max_age
+                or shard['day'] != datetime.now().strftime('%Y%m%d'))
+
+    def write(self, record, on_published=None):
+        """Append one record; cost does not depend on how much was written before"""
+        self.write_serialized(dumps(record), on_published)
+
+    def write_serialized(self, data, on_published=None):
+        """Append a record already serialized with records.dumps
+
+        ``on_published()`` is called once the shard holding the record has
+        been uploaded and listed in the manifest.
+        """
+        line = data + b'\n'
+        with self._lock:
+            if self._shard is not None and self._should_rotate():
+                self._finish_shard()
+            if self._shard is None:
+                self._open_shard()
+            self._shard['stream'].write(line)
+            self._shard['records'] += 1
+            self._shard['bytes'] += len(line)
+            if on_published is not None:
+                self._shard['callbacks'].append(on_published)
+
+    def flush(self):
+        """Upload the current shard (if any) and record it in the manifest"""
+        with self._lock:
+            self._finish_shard()
+
+    def close(self):
+        """Finish the last shard"""
+        self.flush()
+
+    def _finish_shard(self):
+        shard = self._shard
+        if shard is None:
+            return
+        self._shard = None
+
+        if shard['stream'] is not shard['spool']:
+            shard['stream'].close()
+        spool = shard['spool']
+        if shard['records'] == 0:
+            spool.close()
+            return
+
+        spool.seek(0)
+        data = spool.read()
+        spool.close()
+
+        entry = {
+            'name': shard['name'],
+            'records': shard['records'],
+            'bytes': len(data),
+            'uncompressed_bytes': shard['bytes'],
+            'compression': self.compression,
+            'writer': self.writer_id,
+            'finished_at': datetime.now().isoformat(),
+        }
+        manifest = f"{self.prefix}/dt={shard['day']}/_manifest.json"
+        self.storage.submit(self._publish, shard['name'], data, manifest, entry, shard['callbacks'])
+
+    def _publish(self, name, data, manifest, entry, callbacks=()):
+        """Upload a finished shard, then list it in the manifest"""
+        content_encoding = {'gzip': 'gzip', 'zstd': 'zstd'}.get(self.compression)
+        self.storage.upload_bytes(
+            name,
+            data,
+            content_type='application/x-ndjson',
+            content_encoding=content_encoding,
+        )
+        self.storage.append_to_manifest(manifest, entry)
+        print(f"Finished shard {name} ({entry['records']} records)")
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in publish callback for {name}: {e}")
+
+
+def read_jsonl(data, compression=None):
+    """Decode the bytes of a finished shard back into a list of records"""
+    if compression == 'gzip':
+        data = gzip.decompress(data)
+    elif compression == 'zstd':
+        import zstandard
+        data = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)).read()
+    return [loads(line) for line in data.splitlines() if line.strip()]
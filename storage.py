@@ -1,62 +1,67 @@
-from google.cloud import storage
-import sqlite3
 import json
 from datetime import datetime
 import tempfile
+import threading
+import uuid
+from sink import JsonlShardSink
+from catalog import ProductCatalog
+from seen_index import SeenIndex
+from uploader import BackgroundUploader
+from metrics import default_metrics
+from records import dumps
 
 class VintedStorage:
-    def __init__(self, bucket_name):
-        """Initialize with a GCS bucket name"""
-        self.client = storage.Client()
-        self.bucket = self.client.bucket(bucket_name)
+    def __init__(self, bucket_name, bucket=None):
+        """Initialize with a GCS bucket name; the GCS client is created on first use
+
+        Pass ``bucket`` to use another object with the GCS Bucket API instead,
+        e.g. the local-filesystem stand-in used by the benchmarks.
+        """
+        self.bucket_name = bucket_name
+        self._client = None
+        self._bucket = bucket
         self.db_name = "vinted_data.db"
+        self.product_sink = None
+        self.tile_sink = None
+        self.metrics = default_metrics()
+        self.uploader = BackgroundUploader(metrics=self.metrics)
         self.setup_database()
 
+    @property
+    def client(self):
+        if self._client is None:
+            from google.cloud import storage
+            self._client = storage.Client()
+        return self._client
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            self._bucket = self.client.bucket(self.bucket_name)
+        return self._bucket
+
+    def ready(self):
+        """Create the GCS client now rather than on the first upload"""
+        return self.bucket is not None
+
     def setup_database(self):
-        conn = sqlite3.connect(self.db_name)
-        c = conn.cursor()
-        
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS products (
-                id TEXT PRIMARY KEY,
-                title TEXT,
-                price REAL,
-                description TEXT,
-                seller TEXT,
-                likes INTEGER,
-                views INTEGER,
-                brand TEXT,
-                size TEXT,
-                condition TEXT,
-                location TEXT,
-                original_image_urls TEXT,
-                gcs_paths TEXT,
-                scraped_at DATETIME,
-                raw_data TEXT
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """Open the local products catalog and seen-item index"""
+        self.catalog = ProductCatalog(self.db_name)
+        self.seen = SeenIndex(self.db_name)
 
     def save_product(self, product_data):
-        """Save product data to Google Cloud Storage"""
+        """Queue product data for upload to Google Cloud Storage"""
         try:
-            # Create a filename using timestamp to ensure uniqueness
+            # Timestamp for ordering plus a random suffix so that products
+            # saved within the same second don't overwrite each other
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"products/product_{timestamp}.json"
+            filename = f"products/product_{timestamp}_{uuid.uuid4().hex[:8]}.json"
             
-            # Create a blob
-            blob = self.bucket.blob(filename)
-            
-            # Convert data to JSON and upload
-            json_data = json.dumps(product_data, ensure_ascii=False, indent=2)
-            blob.upload_from_string(
-                json_data,
-                content_type='application/json'
-            )
+            # Convert data to JSON and upload in the background
+            self.submit_upload(filename, dumps(product_data), content_type='application/json')
             
-            print(f"Saved product data to {filename}")
+            print(f"Queued product data for {filename}")
+            return filename
             
         except Exception as e:
             print(f"Error saving to storage: {e}")
@@ -70,22 +75,145 @@ class VintedStorage:
                 return []
             
             # Download and parse JSON
-            content = blob.download_as_string()
+            with self.metrics.span('gcs_read'):
+                content = blob.download_as_string()
+            self.metrics.inc('gcs_bytes_read', len(content))
             return json.loads(content)
         except Exception as e:
             print(f"Error reading from GCS: {e}")
             return []
 
     def write_json(self, filename, data):
-        """Write JSON data to GCS bucket"""
+        """Queue JSON data to be written to the GCS bucket"""
         try:
-            blob = self.bucket.blob(filename)
-            
             # Convert data to JSON string
             json_str = json.dumps(data, ensure_ascii=False, indent=2)
             
-            # Upload to GCS
-            blob.upload_from_string(json_str, content_type='application/json')
-            print(f"Successfully wrote to GCS: {filename}")
+            # Upload to GCS in the background
+            self.submit_upload(filename, json_str, content_type='application/json')
+            print(f"Queued write to GCS: {filename}")
         except Exception as e:
-            print(f"Error writing to GCS: {e}") 
\ No newline at end of file
+            print(f"Error writing to GCS: {e}")
+
+    def submit(self, func, *args, **kwargs):
+        """Run a storage job on the background uploader"""
+        self.uploader.submit(func, *args, **kwargs)
+
+    def submit_upload(self, filename, data, content_type='application/octet-stream', content_encoding=None):
+        """Queue an upload; returns immediately unless the queue is full"""
+        self.submit(self.upload_bytes, filename, data,
+                    content_type=content_type, content_encoding=content_encoding)
+
+    def flush(self):
+        """Wait for all queued uploads to finish"""
+        if self.product_sink is not None:
+            self.product_sink.flush()
+        if self.tile_sink is not None:
+            self.tile_sink.flush()
+        self.uploader.flush()
+        self.catalog.flush()
+
+    def upload_bytes(self, filename, data, content_type='application/octet-stream', content_encoding=None):
+        """Upload raw bytes to a new blob"""
+        blob = self.bucket.blob(filename)
+        if content_encoding:
+            blob.content_encoding = content_encoding
+        with self.metrics.span('gcs_upload'):
+            blob.upload_from_string(data, content_type=content_type)
+        self.metrics.inc('gcs_bytes_uploaded', len(data))
+
+    def append_to_manifest(self, filename, entry, max_attempts=10):
+        """Add an entry to a JSON manifest without losing concurrent updates
+
+        Uses the blob generation as a precondition, so if another writer
+        updated the manifest in between we re-read it and try again.
+        """
+        from google.api_core.exceptions import NotFound, PreconditionFailed
+
+        for attempt in range(max_attempts):
+            blob = self.bucket.blob(filename)
+            with self.metrics.span('manifest_update'):
+                try:
+                    content = blob.download_as_bytes()
+                    manifest = json.loads(content)
+                    generation = blob.generation
+                except NotFound:
+                    manifest = {'shards': []}
+                    generation = 0
+
+                manifest['shards'].append(entry)
+                try:
+                    blob.upload_from_string(
+                        json.dumps(manifest, ensure_ascii=False, indent=2),
+                        content_type='application/json',
+                        if_generation_match=generation,
+                    )
+                    return
+                except PreconditionFailed:
+                    self.metrics.inc('retries', stage='manifest_update')
+                    continue
+        self.metrics.inc('errors', stage='manifest_update')
+        raise RuntimeError(f"Could not update manifest {filename} after {max_attempts} attempts")
+
+    def read_manifest(self, filename):
+        """Return the list of finished shards in a manifest"""
+        manifest = self.read_json(filename)
+        return manifest.get('shards', []) if manifest else []
+
+    def get_product_sink(self):
+        """Return the shared JSONL sink for scraped product records"""
+        if self.product_sink is None:
+            self.product_sink = JsonlShardSink(self, prefix="products")
+        return self.product_sink
+
+    def get_tile_sink(self):
+        """Return the shared JSONL sink for lightweight catalog tile records"""
+        if self.tile_sink is None:
+            self.tile_sink = JsonlShardSink(self, prefix="tiles")
+        return self.tile_sink
+
+    def append_tiles(self, tile_records):
+        """Append tile records to the tiles dataset and the local listings table
+
+        Returns {item_id: price} with the previously seen price of items
+        that were already listed.
+        """
+        sink = self.get_tile_sink()
+        for record in tile_records:
+            sink.write(record)
+        return self.catalog.upsert_tiles(tile_records)
+
+    def append_product(self, product_data, on_stored=None):
+        """Append a product record to the sharded daily dataset and the local catalog
+
+        The record is serialized once and the same bytes go to both.
+        ``on_stored()`` is called (from a storage thread) once the record's
+        shard is uploaded and its catalog batch committed. The item only
+        counts as seen at that point too, so an item lost in a crash (before
+        its shard reached GCS or its row was committed) is scraped again in full.
+        """
+        data = dumps(product_data)
+        url = product_data.get('url')
+        remaining = [2]
+        lock = threading.Lock()
+
+        def stored():
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            self.seen.mark_scraped(url)
+            if on_stored is not None:
+                on_stored()
+        self.get_product_sink().write_serialized(data, on_published=stored)
+        self.catalog.upsert(product_data, raw=data, on_written=stored)
+
+    def close(self):
+        """Upload any partially filled shard and wait for pending uploads"""
+        if self.product_sink is not None:
+            self.product_sink.close()
+        if self.tile_sink is not None:
+            self.tile_sink.close()
+        self.uploader.close()
+        self.catalog.close()
+        self.seen.close()
@@ -0,0 +1,66 @@
+import re
+from datetime import datetime
+
+from extraction import item_id_from_url, parse_price
+
+# "key: value" pairs in a tile link's title, e.g.
+# "Floral dress, brand: Zara, condition: Very good, size: M, $12.00"
+_TITLE_FIELD = re.compile(r'\b(brand|condition|size):\s*([^,]+)')
+
+
+def tile_record(tile, scrape_time=None):
+    """Lightweight listing record from one tile returned by TILE_SCRIPT"""
+    title_text = tile.get('title') or ''
+    fields = {key: value.strip() for key, value in _TITLE_FIELD.findall(title_text)}
+    subtitle = [part.strip() for part in re.split(r'[·•|]', tile.get('subtitle') or '') if part.strip()]
+    item_id = item_id_from_url(tile.get('url'))
+    return {
+        'id': str(item_id) if item_id else None,
+        'url': tile.get('url'),
+        'title': title_text.split(',')[0].strip() or None,
+        'brand': tile.get('brand') or fields.get('brand'),
+        'size': fields.get('size') or (subtitle[0] if subtitle else None),
+        'condition': fields.get('condition') or (subtitle[1] if len(subtitle) > 1 else None),
+        'price': tile.get('price') or None,
+        'thumbnail_url': tile.get('thumbnail_url'),
+        'scrape_time': scrape_time or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'source': 'tile',
+    }
+
+
+class DetailCriteria:
+    """Which already-known listings still get a full detail-page scrape.
+
+    New items are always scraped in full. A known item is scraped again if
+    its tile price differs from the last one seen (``price_changed``), or
+    if it matches every configured filter: ``brands`` (case-insensitive),
+    ``min_price``/``max_price`` and ``keywords`` (any, in the title). With
+    no filters configured only price changes qualify.
+    """
+
+    def __init__(self, brands=None, min_price=None, max_price=None, keywords=None, price_changed=True):
+        self.brands = {b.lower() for b in brands} if brands else None
+        self.min_price = min_price
+        self.max_price = max_price
+        self.keywords = [k.lower() for k in keywords] if keywords else None
+        self.price_changed = price_changed
+
+    def _filters(self, record, price):
+        title = (record.get('title') or '').lower()
+        brand = (record.get('brand') or '').lower()
+        if self.brands is not None:
+            yield brand in self.brands
+        if self.min_price is not None:
+            yield price is not None and price >= self.min_price
+        if self.max_price is not None:
+            yield price is not None and price <= self.max_price
+        if self.keywords is not None:
+            yield any(k in title for k in self.keywords)
+
+    def matches(self, record, previous_price=None):
+        price = parse_price(record.get('price'))
+        if self.price_changed and previous_price is not None and price is not None \
+                and price != previous_price:
+            return True
+        results = list(self._filters(record, price))
+        return bool(results) and all(results)
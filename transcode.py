@@ -0,0 +1,201 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Variants produced next to the original: longest side, output format and quality
+DEFAULT_VARIANTS = {
+    'thumb': {'max_size': 320, 'format': 'WEBP', 'quality': 80},
+    'large': {'max_size': 1024, 'format': 'WEBP', 'quality': 85},
+}
+
+# Pillow format -> (content type, blob extension)
+FORMAT_TYPES = {
+    'JPEG': ('image/jpeg', '.jpg'),
+    'PNG': ('image/png', '.png'),
+    'WEBP': ('image/webp', '.webp'),
+    'GIF': ('image/gif', '.gif'),
+}
+
+# JPEG segments kept when stripping metadata: APP0 (JFIF), APP2 (ICC profile)
+_KEEP_SEGMENTS = {0xE0, 0xE2}
+
+# VP8X flag bits for the EXIF and XMP chunks
+_WEBP_EXIF = 0x08
+_WEBP_XMP = 0x04
+
+
+def orientation_exif(orientation):
+    """TIFF-format EXIF block holding nothing but the Orientation tag"""
+    return (b'MM\x00\x2a' + (8).to_bytes(4, 'big') +
+            (1).to_bytes(2, 'big') +
+            # Tag 0x0112, type SHORT, one value, padded to 4 bytes
+            b'\x01\x12\x00\x03' + (1).to_bytes(4, 'big') + orientation.to_bytes(2, 'big') + b'\x00\x00' +
+            (0).to_bytes(4, 'big'))
+
+
+def strip_jpeg_metadata(data, orientation=1):
+    """Drop EXIF/XMP (APP1, APP3-15) and comment segments from a JPEG without re-encoding
+
+    A rotated image (orientation other than 1) gets an EXIF segment with only
+    the Orientation tag back, so viewers still show it upright.
+    """
+    if data[:2] != b'\xff\xd8':
+        return data
+    out = [data[:2]]
+    pos = 2
+    while pos + 4 <= len(data) and data[pos] == 0xFF:
+        marker = data[pos + 1]
+        if marker == 0xDA:
+            # Start of scan: the entropy-coded image data follows to the end
+            break
+        length = int.from_bytes(data[pos + 2:pos + 4], 'big')
+        segment = data[pos:pos + 2 + length]
+        if not (0xE0 <= marker <= 0xEF or marker == 0xFE) or marker in _KEEP_SEGMENTS:
+            out.append(segment)
+        pos += 2 + length
+    out.append(data[pos:])
+    if orientation != 1:
+        exif = b'Exif\x00\x00' + orientation_exif(orientation)
+        # After the JFIF segment if there is one, which has to come first
+        at = 2 if len(out) > 2 and out[1][:2] == b'\xff\xe0' else 1
+        out.insert(at, b'\xff\xe1' + (len(exif) + 2).to_bytes(2, 'big') + exif)
+    return b''.join(out)
+
+
+def strip_webp_metadata(data, orientation=1):
+    """Drop the EXIF and XMP chunks from a WebP without re-encoding
+
+    As for JPEGs, a rotated image keeps an EXIF chunk with only its Orientation.
+    """
+    if data[:4] != b'RIFF' or data[8:12] != b'WEBP':
+        return data
+    chunks = []
+    pos = 12
+    while pos + 8 <= len(data):
+        fourcc = data[pos:pos + 4]
+        size = int.from_bytes(data[pos + 4:pos + 8], 'little')
+        end = pos + 8 + size + (size & 1)
+        if fourcc not in (b'EXIF', b'XMP '):
+            chunks.append(bytearray(data[pos:end]))
+        pos = end
+    if not chunks or chunks[0][:4] != b'VP8X':
+        # Simple-format WebP: no room for metadata in the first place
+        return data
+    chunks[0][8] &= ~(_WEBP_EXIF | _WEBP_XMP) & 0xFF
+    if orientation != 1:
+        exif = orientation_exif(orientation)
+        chunks[0][8] |= _WEBP_EXIF
+        chunks.append(b'EXIF' + len(exif).to_bytes(4, 'little') + exif)
+    body = b'WEBP' + b''.join(chunks)
+    return b'RIFF' + len(body).to_bytes(4, 'little') + body
+
+
+def _skip_sub_blocks(data, pos):
+    while pos < len(data) and data[pos]:
+        pos += data[pos] + 1
+    return pos + 1
+
+
+def strip_gif_metadata(data):
+    """Drop comment and application extensions (e.g. XMP) from a GIF, keeping the loop count"""
+    if data[:3] != b'GIF' or len(data) < 13:
+        return data
+    pos = 13
+    if data[10] & 0x80:
+        pos += 3 << ((data[10] & 0x07) + 1)
+    out = [data[:pos]]
+    while pos < len(data):
+        block = data[pos]
+        if block == 0x21 and pos + 1 < len(data):
+            end = _skip_sub_blocks(data, pos + 2)
+            label = data[pos + 1]
+            keep = label not in (0xFE, 0xFF) or data[pos + 3:pos + 14] in (b'NETSCAPE2.0', b'ANIMEXTS1.0')
+            if keep:
+                out.append(data[pos:end])
+            pos = end
+        elif block == 0x2C and pos + 10 <= len(data):
+            end = pos + 10
+            if data[pos + 9] & 0x80:
+                end += 3 << ((data[pos + 9] & 0x07) + 1)
+            # LZW minimum code size, then the image data sub-blocks
+            end = _skip_sub_blocks(data, end + 1)
+            out.append(data[pos:end])
+            pos = end
+        else:
+            # Trailer, or anything unexpected: keep the rest as it is
+            out.append(data[pos:])
+            break
+    return b''.join(out)
+
+
+def _save_kwargs(image_format, quality):
+    if image_format == 'WEBP':
+        return {'quality': quality, 'method': 4}
+    if image_format == 'JPEG':
+        return {'quality': quality, 'optimize': True, 'progressive': True}
+    return {'optimize': True}
+
+
+def transcode(data, variants):
+    """Original (metadata stripped) plus resized variants of one image
+
+    Returns {'original': (bytes, content_type, ext), name: (bytes, content_type, ext), ...}.
+    Runs in a worker process, so it only takes and returns plain values.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as image:
+        image_format = image.format
+        content_type, ext = FORMAT_TYPES.get(
+            image_format, (Image.MIME.get(image_format, 'application/octet-stream'),
+                           f".{(image_format or 'bin').lower()}"))
+
+        # Originals keep their encoded pixels; only rotated ones keep an Orientation tag
+        orientation = image.getexif().get(0x0112, 1)
+        if image_format == 'JPEG':
+            original = strip_jpeg_metadata(data, orientation)
+        elif image_format == 'WEBP':
+            original = strip_webp_metadata(data, orientation)
+        elif image_format == 'GIF':
+            original = strip_gif_metadata(data)
+        elif image_format == 'PNG':
+            buffer = io.BytesIO()
+            image.save(buffer, format='PNG', optimize=True)
+            original = buffer.getvalue()
+        else:
+            original = data
+        result = {'original': (original, content_type, ext)}
+
+        # Variants are stored upright and carry no metadata at all
+        upright = ImageOps.exif_transpose(image)
+        if upright.mode not in ('RGB', 'RGBA'):
+            upright = upright.convert('RGBA' if 'transparency' in upright.info else 'RGB')
+        for name, spec in variants.items():
+            variant = upright.copy()
+            variant.thumbnail((spec['max_size'], spec['max_size']), Image.Resampling.LANCZOS)
+            variant_format = spec.get('format', 'WEBP')
+            if variant_format == 'JPEG' and variant.mode == 'RGBA':
+                variant = variant.convert('RGB')
+            buffer = io.BytesIO()
+            variant.save(buffer, format=variant_format, **_save_kwargs(variant_format, spec.get('quality', 80)))
+            result[name] = (buffer.getvalue(), *FORMAT_TYPES[variant_format])
+    return result
+
+
+class ImageTranscoder:
+    """Strip metadata and produce thumbnail/WebP variants on all cores.
+
+    ``run(data)`` hands the image to a process pool (one worker per core by
+    default) and blocks the calling download thread until the result is
+    ready, so the image pipeline's threads keep every core busy.
+    """
+
+    def __init__(self, variants=None, workers=None):
+        self.variants = DEFAULT_VARIANTS if variants is None else variants
+        self._executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+
+    def run(self, data):
+        return self._executor.submit(transcode, data, self.variants).result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
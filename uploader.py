@@ -0,0 +1,82 @@
+import queue
+import random
+import threading
+import time
+
+from metrics import default_metrics
+
+
+class BackgroundUploader:
+    """Run storage uploads on a pool of worker threads.
+
+    Jobs are put on a bounded queue, so a producer that gets too far ahead of
+    the network blocks in ``submit`` instead of buffering without limit. Each
+    worker takes one job at a time, so a burst is spread over all of them,
+    and retries failed jobs with exponential backoff. ``flush`` waits until every
+    submitted job has finished; ``close`` flushes and stops the workers.
+    """
+
+    _STOP = object()
+
+    def __init__(self, workers=4, max_queue=256,
+                 max_retries=5, backoff=0.5, max_backoff=30.0, metrics=None):
+        self.metrics = metrics or default_metrics()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failed = []
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._run, name=f"uploader-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, func, *args, **kwargs):
+        """Queue a job; blocks while the queue is full (backpressure)"""
+        if self._closed:
+            raise RuntimeError("Uploader is closed")
+        self._queue.put((func, args, kwargs))
+
+    def flush(self):
+        """Block until every job submitted so far has been processed"""
+        self._queue.join()
+
+    def close(self):
+        """Flush pending jobs and stop the worker threads"""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(self._STOP)
+        for thread in self._threads:
+            thread.join()
+        if self.failed:
+            print(f"{len(self.failed)} upload job(s) failed permanently")
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is self._STOP:
+                    return
+                self._run_with_retry(*job)
+            finally:
+                self._queue.task_done()
+
+    def _run_with_retry(self, func, args, kwargs):
+        for attempt in range(self.max_retries + 1):
+            try:
+                func(*args, **kwargs)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"Upload job {getattr(func, '__name__', func)} failed: {e}")
+                    self.failed.append((func, args, kwargs, e))
+                    self.metrics.inc('errors', stage='upload')
+                    return
+                self.metrics.inc('retries', stage='upload')
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+                time.sleep(delay + random.uniform(0, delay / 2))
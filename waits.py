@@ -0,0 +1,87 @@
+import time
+from collections import defaultdict
+
+import extraction
+from metrics import default_metrics
+
+
+# One "page ready" locator per page type. The strategies are the values of
+# selenium's By constants, so selenium is only imported once a wait runs.
+PAGE_READY = {
+    'home': ('link text', "Women"),
+    'catalog': ('css selector', "#content div.new-item-box__image-container > a"),
+    'search': ('xpath', '//a[contains(@class, "item-link")] | //div[contains(@class, "new-item-box__image-container")]/a'),
+    'product': ('class name', extraction.MAIN_INFO_CLASS),
+}
+
+
+class WaitStrategy:
+    """Explicit, condition-driven waits with per-page timing.
+
+    The driver runs with a zero implicit wait, so lookups of optional fields
+    return immediately. Pages are waited for with one explicit condition per
+    page type, and every wait's duration is recorded under a label so
+    ``summary()`` shows where the latency goes.
+    """
+
+    def __init__(self, driver, timeout=10, poll_frequency=0.1, metrics=None):
+        self.driver = driver
+        self.metrics = metrics or default_metrics()
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.timings = defaultdict(list)
+
+    def until(self, condition, label, timeout=None):
+        """Wait for a condition, recording how long it took; raises TimeoutException"""
+        from selenium.webdriver.support.ui import WebDriverWait
+        start = time.perf_counter()
+        try:
+            return WebDriverWait(self.driver, timeout or self.timeout,
+                                 poll_frequency=self.poll_frequency).until(condition)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[label].append(elapsed)
+            self.metrics.observe('wait_seconds', elapsed, label=label)
+
+    def page_ready(self, page_type, timeout=None):
+        """Wait until a page of the given type is usable; returns False on timeout"""
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support import expected_conditions as EC
+        locator = PAGE_READY[page_type]
+        try:
+            self.until(EC.presence_of_element_located(locator), page_type, timeout)
+            return True
+        except TimeoutException:
+            print(f"Timed out waiting for {page_type} page")
+            return False
+
+    def clickable(self, locator, label, timeout=None):
+        """Wait for an element to be clickable and return it"""
+        from selenium.webdriver.support import expected_conditions as EC
+        return self.until(EC.element_to_be_clickable(locator), label, timeout)
+
+    def gone(self, element, label, timeout=None):
+        """Wait for an element to be detached or hidden, e.g. a closed popup"""
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support import expected_conditions as EC
+        try:
+            self.until(EC.invisibility_of_element(element), label, timeout)
+        except TimeoutException:
+            pass
+
+    def optional(self, by, selector, root=None):
+        """Non-blocking lookup: first matching element or None"""
+        elements = (root or self.driver).find_elements(by, selector)
+        return elements[0] if elements else None
+
+    def summary(self):
+        """Per-label wait statistics in seconds"""
+        return {
+            label: {
+                'count': len(times),
+                'total': round(sum(times), 3),
+                'mean': round(sum(times) / len(times), 3),
+                'max': round(max(times), 3),
+            }
+            for label, times in self.timings.items() if times
+        }
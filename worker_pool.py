@@ -0,0 +1,186 @@
+import os
+import queue
+import threading
+from functools import partial
+
+from storage import VintedStorage
+from image_pipeline import ImagePipeline
+from scraper import Scraper
+from scheduler import default_scheduler
+
+
+def default_worker_count():
+    """Number of browsers to run on this machine (VINTED_WORKERS overrides)"""
+    configured = os.environ.get('VINTED_WORKERS')
+    if configured:
+        return max(1, int(configured))
+    # Each Chrome instance needs roughly a core and a few hundred MB of RAM
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+class ScraperPool:
+    """Scrape product URLs with N independent Chrome workers.
+
+    URLs are fed through a shared queue. Every worker owns its own browser,
+    handles the country/cookie popups once when it starts, and writes
+    results through the shared VintedStorage and ImagePipeline. If a
+    worker's browser dies, it is replaced and the URL is queued again, up
+    to ``max_attempts`` times.
+    """
+
+    _STOP = object()
+
+    def __init__(self, workers=None, bucket_name="scrape_content", extraction_mode="script",
+                 max_attempts=3, home_url="https://www.vinted.com", fetch_mode="browser",
+                 page_profiles=None, capture_images=False, transcode_images=False,
+                 find_duplicates=False):
+        self.workers = workers or default_worker_count()
+        self.extraction_mode = extraction_mode
+        self.fetch_mode = fetch_mode
+        self.page_profiles = page_profiles
+        self.capture_images = capture_images
+        self.max_attempts = max_attempts
+        self.home_url = home_url
+        self.storage = VintedStorage(bucket_name)
+        self.scheduler = default_scheduler()
+        transcoder = None
+        if transcode_images:
+            from transcode import ImageTranscoder
+            transcoder = ImageTranscoder()
+        self.images = ImagePipeline(self.storage, scheduler=self.scheduler, transcoder=transcoder,
+                                    perceptual_hashes=find_duplicates)
+        self.duplicates = None
+        if find_duplicates:
+            from near_duplicates import NearDuplicateIndex
+            self.duplicates = NearDuplicateIndex(self.storage.db_name)
+
+        self.scraped = 0
+        self.restarts = 0
+        self.failed = []
+        self._stats_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._closed = False
+        self._threads = []
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, args=(i,), name=f"scraper-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"Started scraper pool with {self.workers} workers")
+
+    def submit(self, product_url, on_done=None, category=None):
+        """Queue a product URL for scraping
+
+        ``on_done(product_url, True)`` is called from a storage thread once
+        the product record has been durably stored (see ``flush``), and
+        ``on_done(product_url, False)`` from the worker thread when the URL
+        has finally failed. ``category`` is passed on to scrape_product.
+        """
+        if self._closed:
+            raise RuntimeError("Scraper pool is closed")
+        self._queue.put((product_url, 1, on_done, category))
+
+    def join(self):
+        """Block until every queued URL has been processed"""
+        self._queue.join()
+
+    def flush(self):
+        """Wait for queued images and write out buffered records, running their on_done callbacks"""
+        self.join()
+        self.images.wait()
+        self.storage.flush()
+
+    def close(self):
+        """Finish queued work, stop the browsers and flush storage"""
+        if self._closed:
+            return
+        self.join()
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(self._STOP)
+        for thread in self._threads:
+            thread.join()
+        self.images.close()
+        if self.duplicates is not None:
+            self.duplicates.close()
+        self.storage.close()
+        print(f"Scraper pool done: {self.scraped} scraped, "
+              f"{len(self.failed)} failed, {self.restarts} browser restarts")
+
+    def _start_scraper(self, worker_id):
+        """Create a worker's scraper; in browser mode launch Chrome and get past the popups
+
+        In http mode the browser is only started if a page has to fall back to it.
+        """
+        print(f"Worker {worker_id}: starting scraper ({self.fetch_mode})")
+        scraper = Scraper(extraction_mode=self.extraction_mode, fetch_mode=self.fetch_mode,
+                          storage=self.storage, images=self.images, scheduler=self.scheduler,
+                          page_profiles=self.page_profiles, capture_images=self.capture_images,
+                          home_url=self.home_url, duplicates=self.duplicates)
+        if self.fetch_mode == 'browser':
+            scraper._ensure_session()
+        return scraper
+
+    @staticmethod
+    def _notify(on_done, product_url, ok):
+        if on_done is None:
+            return
+        try:
+            on_done(product_url, ok)
+        except Exception as e:
+            print(f"Error in completion callback for {product_url}: {e}")
+
+    @staticmethod
+    def _is_alive(scraper):
+        if scraper._driver is None:
+            # No browser was started, so there is none to have died
+            return True
+        try:
+            scraper.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _discard(scraper):
+        if scraper is None:
+            return
+        try:
+            scraper.close()
+        except Exception:
+            pass
+
+    def _run(self, worker_id):
+        scraper = None
+        while True:
+            job = self._queue.get()
+            try:
+                if job is self._STOP:
+                    break
+                product_url, attempt, on_done, category = job
+                try:
+                    if scraper is None:
+                        scraper = self._start_scraper(worker_id)
+                    result = scraper.scrape_product(
+                        product_url, on_stored=partial(self._notify, on_done, product_url, True),
+                        category=category)
+                    if result is None and not self._is_alive(scraper):
+                        raise RuntimeError("browser is no longer responding")
+                    with self._stats_lock:
+                        self.scraped += 1
+                    if result is None:
+                        self._notify(on_done, product_url, False)
+                except Exception as e:
+                    print(f"Worker {worker_id}: browser failed on {product_url}: {e}")
+                    self._discard(scraper)
+                    scraper = None
+                    with self._stats_lock:
+                        self.restarts += 1
+                        if attempt < self.max_attempts:
+                            self._queue.put((product_url, attempt + 1, on_done, category))
+                        else:
+                            self.failed.append(product_url)
+                    if attempt >= self.max_attempts:
+                        self._notify(on_done, product_url, False)
+            finally:
+                self._queue.task_done()
+        self._discard(scraper)